@@ -5,12 +5,15 @@ AI Fabric Shell - Local AI automation with Rich UI, plugin system, and model swi
 __version__ = "2.0.0"
 __author__ = "AI Fabric Shell"
 
-# Core imports for easy access
-from .core.shell import AIFabricShell
-from .models.manager import ModelManager
-from .plugins.manager import PluginManager
-from .rendering.renderer import ResponseRenderer
-from .core.system_info import SystemInfo
+# Core classes for easy access, imported lazily on first attribute access
+# so importing the package does not pull in ollama, psutil and Rich up front
+_LAZY_IMPORTS = {
+    'AIFabricShell': '.core.shell',
+    'ModelManager': '.models.manager',
+    'PluginManager': '.plugins.manager',
+    'ResponseRenderer': '.rendering.renderer',
+    'SystemInfo': '.core.system_info',
+}
 
 __all__ = [
     'AIFabricShell',
@@ -18,4 +21,12 @@ __all__ = [
     'PluginManager',
     'ResponseRenderer',
     'SystemInfo'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -2,7 +2,17 @@
 Core AI Fabric Shell components
 """
 
-from .shell import AIFabricShell
-from .system_info import SystemInfo
+_LAZY_IMPORTS = {
+    'AIFabricShell': '.shell',
+    'SystemInfo': '.system_info',
+}
 
-__all__ = ['AIFabricShell', 'SystemInfo']
\ No newline at end of file
+__all__ = ['AIFabricShell', 'SystemInfo']
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Prompt templates for AI interactions
+
+Each template is a static preamble followed by a dynamic block. Preambles never
+interpolate session or user values, so prompts of the same kind share a byte-identical
+prefix that Ollama can reuse from its prompt cache; everything variable goes last.
+"""
+
+from types import MappingProxyType
+
+# Dynamic block shared by the system status analyses
+_STATUS_DYNAMIC = """## System
+- **Operating System:** {os_name}
+- **Current Shell:** {shell}
+
+## Available Tools
+{tools}
+
+## Current System Status
+- **CPU Usage:** {cpu:.1f}%
+- **Memory Usage:** {memory:.1f}%
+- **Disk Usage:** {disk:.1f}%"""
+
+PROMPT_TEMPLATES = MappingProxyType({
+    'oneliner': (
+        """Generate a single-line command for the task given at the end.
+
+Requirements:
+- Single line only
+- Use the syntax of the shell named under Environment
+- Production-ready and safe
+- Respond with ONLY the command (no explanation/markdown)""",
+        """## Environment
+- Shell: {shell} ({shell_context})
+{history}
+## Task
+{task}"""
+    ),
+    'alternative': (
+        """The previous command didn't accomplish the user's goal. Generate an alternative approach.
+
+Requirements:
+- Use a completely different method if possible
+- Single line command only
+- Use the syntax of the shell named under Environment
+- Respond with ONLY the command (no explanation/markdown)""",
+        """## Environment
+- Shell: {shell}
+
+## Original Task
+{task}
+
+## Previous Command (didn't work as expected)
+```{shell}
+{command}
+```
+
+## Previous Output
+```
+{output}
+```"""
+    ),
+    'troubleshoot': (
+        """A shell command failed. Analyze the error and provide a solution.
+
+Please provide:
+1. **Root Cause Analysis** - What went wrong?
+2. **Corrected Command** - Fixed version that should work
+3. **Alternative Approaches** - Other ways to accomplish the task
+
+Format your response with clear sections and use code blocks for commands.""",
+        """## Environment
+- Shell: {shell}
+- Platform: {platform}
+
+## Original Task
+{task}
+
+## Failed Command
+```{shell}
+{command}
+```
+
+## Error Output
+```
+{error}
+```"""
+    ),
+    'script_troubleshoot': (
+        """A script failed. Analyze and provide a comprehensive solution.
+
+Please provide:
+
+### 1. Root Cause Analysis
+What exactly went wrong and why?
+
+### 2. Corrected Script
+Provide a fixed version with proper error handling.
+
+### 3. Alternative Approaches
+Suggest different ways to accomplish the same goal.
+
+### 4. Best Practices
+Tips to prevent similar issues in the future.
+
+Use proper code blocks and clear explanations.""",
+        """## Environment
+- Platform: {platform}
+- Shell: {shell}
+
+## Language
+{language}
+
+## Failed Script
+```{language}
+{code}
+```
+
+## Error Output
+```
+{error}
+```"""
+    ),
+    'quick_troubleshoot': (
+        """Analyze and troubleshoot the issue described at the end.
+
+Please provide a comprehensive troubleshooting guide with:
+
+### 1. Likely Causes
+What are the most probable reasons for this issue?
+
+### 2. Diagnostic Commands
+Shell commands to gather more information and diagnose the problem.
+
+### 3. Step-by-Step Solutions
+Detailed solutions ranked by likelihood of success.
+
+### 4. Prevention Tips
+How to avoid this issue in the future.
+
+Use proper formatting with code blocks for commands and clear section headers.""",
+        """## Environment
+- OS: {os_name}
+- Shell: {shell}
+- Platform: {platform}
+
+## Issue Description
+{issue}"""
+    ),
+    'passthrough': (
+        """A shell command failed. Analyze the error and provide a corrected command.
+
+Provide:
+1. Brief explanation of what went wrong
+2. Corrected command that should work
+3. Alternative approaches if applicable
+
+Format your response with clear sections and code blocks for any commands.""",
+        """**Shell:** {shell}
+**Platform:** {platform}
+
+**Failed Command:** {command}
+**Error:** {error}"""
+    ),
+    'status': (
+        """Analyze the system metrics at the end and provide actionable recommendations.
+
+Please provide:
+
+### Performance Assessment
+Overall system health evaluation.
+
+### Optimization Recommendations
+2-3 specific, actionable recommendations for this operating system.
+
+### Commands to Run
+Specific shell commands that would help optimize performance.
+
+Focus on practical optimizations specific to the operating system below.""",
+        _STATUS_DYNAMIC
+    ),
+    'status_security': (
+        """Review the system described at the end from a security perspective.
+
+Please provide:
+
+### Security Assessment
+Likely weak points given the operating system and installed tools.
+
+### Hardening Recommendations
+2-3 specific, actionable hardening steps for this operating system.
+
+### Commands to Run
+Specific shell commands to audit or improve security.
+
+Focus on practical checks specific to the operating system below.""",
+        _STATUS_DYNAMIC
+    ),
+    'status_health': (
+        """Assess the overall health of the system described at the end.
+
+Please provide:
+
+### Health Summary
+Whether resource usage looks normal and what stands out.
+
+### Maintenance Recommendations
+2-3 specific maintenance tasks worth doing now (cleanup, updates, services).
+
+### Commands to Run
+Specific shell commands to check and maintain system health.
+
+Focus on practical maintenance specific to the operating system below.""",
+        _STATUS_DYNAMIC
+    ),
+})
+
+def render_prompt(template_id: str, **values) -> str:
+    """Render a prompt template: static preamble first, then the filled-in dynamic block"""
+    preamble, dynamic = PROMPT_TEMPLATES[template_id]
+    return f"{preamble}\n\n{dynamic.format(**values)}"
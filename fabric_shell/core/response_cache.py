@@ -0,0 +1,283 @@
+"""
+Exact and semantic response caches for AI interactions
+"""
+
+import hashlib
+import json
+import math
+import operator
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from ..utils.console import console
+
+try:
+    import orjson  # Optional: reads and writes the cache files several times faster
+except ImportError:
+    orjson = None
+
+try:
+    import numpy  # Optional: scores a whole cache partition with one matrix product
+except ImportError:
+    numpy = None
+
+# Dot product of two vectors; math.sumprod (Python 3.12+) avoids an intermediate per element
+_dot = getattr(math, 'sumprod', None) or (lambda a, b: sum(map(operator.mul, a, b)))
+
+def _read_json(path: Path) -> Any:
+    """Parse a JSON file"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_json(path: Path, data: Any):
+    """Write data to a JSON file"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+class ExactResponseCache:
+    """LRU of responses keyed by a digest of (model, full prompt), persisted across sessions"""
+    
+    def __init__(self, max_entries: int = 256, ttl: int = 7 * 24 * 3600, cache_file: Optional[str] = None):
+        """
+        Initialize the exact-match cache.
+        
+        Args:
+            max_entries: Maximum number of cached responses kept
+            ttl: Seconds after which cached responses expire
+            cache_file: Persistence file, defaults to ~/.fabric_shell/response_cache.json
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_file = Path(cache_file) if cache_file else Path.home() / ".fabric_shell" / "response_cache.json"
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = self._load()
+        self._dirty = False
+        self._lock = threading.Lock()  # AI requests may run on worker threads
+    
+    @staticmethod
+    def key(model: str, full_prompt: str) -> str:
+        """Fixed-size key for a model and the exact prompt it was sent"""
+        return hashlib.blake2b(f"{model}\0{full_prompt}".encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _load(self) -> "OrderedDict[str, Tuple[str, float]]":
+        """Load unexpired entries from disk, oldest first"""
+        if not self.cache_file.exists():
+            return OrderedDict()
+        
+        try:
+            entries = _read_json(self.cache_file)
+            cutoff = time.time() - self.ttl
+            return OrderedDict((key, (response, created)) for key, response, created in entries
+                               if created >= cutoff)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not load response cache: {e}[/yellow]")
+            return OrderedDict()
+    
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (response, created timestamp) for a key, if cached and unexpired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time() - self.ttl:
+                del self._entries[key]
+                self._dirty = True
+                return None
+            self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key: str, response: str):
+        """Cache a response, evicting the least recently used entry beyond capacity"""
+        with self._lock:
+            self._entries[key] = (response, time.time())
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+    
+    def discard(self, key: str):
+        """Drop a cached response, e.g. one the user rejected"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+    
+    def flush(self):
+        """Persist the cache to disk, if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                _write_json(self.cache_file, [[key, response, created]
+                                              for key, (response, created) in self._entries.items()])
+                self._dirty = False
+            except Exception as e:
+                console.print(f"[yellow]Warning: Could not save response cache: {e}[/yellow]")
+
+class SemanticResponseCache:
+    """Reuse AI responses for prompts that are semantically close to earlier ones"""
+
+    def __init__(self, embed_func: Callable[[str], List[float]], threshold: float = 0.92,
+                 ttl: int = 3600, max_entries: int = 256, cache_file: Optional[str] = None):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            embed_func: Callable returning an embedding vector for a text
+            threshold: Minimum cosine similarity for a cached response to be reused
+            ttl: Seconds after which cached responses expire
+            max_entries: Maximum number of cached responses kept
+            cache_file: Persistence file, defaults to ~/.fabric_shell/semantic_cache.json
+        """
+        self.embed_func = embed_func
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_file = Path(cache_file) if cache_file else Path.home() / ".fabric_shell" / "semantic_cache.json"
+        self.entries: List[Dict[str, Any]] = self._load()
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._partitions: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        # Embedding matrix per partition, with the partition list it was built from
+        self._matrices: Dict[Tuple[str, str], Tuple[List[Dict[str, Any]], Any]] = {}
+        self._reindex()
+        self._dirty = False
+        self._last_embedding = (None, None)
+        self._lock = threading.Lock()  # AI requests may run on worker threads
+
+    def _load(self) -> List[Dict[str, Any]]:
+        """Load unexpired cache entries from disk"""
+        if not self.cache_file.exists():
+            return []
+
+        try:
+            entries = _read_json(self.cache_file)
+            cutoff = time.time() - self.ttl
+            return [entry for entry in entries if entry['created'] >= cutoff]
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not load response cache: {e}[/yellow]")
+            return []
+
+    def _reindex(self):
+        """Rebuild the digest index and the per-(model, category) partitions"""
+        exact, partitions = {}, {}
+        for entry in self.entries:
+            if 'key' in entry:
+                exact[entry['key']] = entry
+            partitions.setdefault((entry['model'], entry['category']), []).append(entry)
+        self._exact, self._partitions = exact, partitions
+        self._matrices = {}
+    
+    def _save(self):
+        """Persist cache entries to disk"""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            _write_json(self.cache_file, self.entries)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not save response cache: {e}[/yellow]")
+
+    @staticmethod
+    def _key(text: str, model: str, category: str) -> str:
+        """Fixed-size digest used for exact-match lookups"""
+        return hashlib.blake2b(f"{model}\0{category}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """Get the L2-normalized embedding for a text, reusing the last computed one"""
+        last_text, last_vector = self._last_embedding
+        if text == last_text:
+            return last_vector
+
+        try:
+            vector = list(self.embed_func(text))
+        except Exception:
+            return None
+
+        norm = math.sqrt(_dot(vector, vector))
+        if not norm:
+            return None
+        vector = [value / norm for value in vector]
+        self._last_embedding = (text, vector)
+        return vector
+
+    def lookup(self, text: str, model: str, category: str) -> Optional[Tuple[str, float]]:
+        """Return (response, created timestamp) cached for a semantically similar prompt, if any"""
+        if not self.entries:
+            return None
+
+        # Identical prompts are answered from the digest index without an embedding request
+        cutoff = time.time() - self.ttl
+        exact = self._exact.get(self._key(text, model, category))
+        if exact is not None and exact['created'] >= cutoff:
+            return exact['response'], exact['created']
+
+        query = self._embed(text)
+        if query is None:
+            return None
+
+        # Only responses from the same model and task category are compared
+        best_score, best_entry = self.threshold, None
+        partition = self._partitions.get((model, category), ())
+        for entry, score in zip(partition, self._scores(query, (model, category), partition)):
+            if entry['created'] >= cutoff and score >= best_score:
+                best_score, best_entry = score, entry
+
+        return (best_entry['response'], best_entry['created']) if best_entry else None
+
+    def _scores(self, query: List[float], key: Tuple[str, str], partition: List[Dict[str, Any]]) -> List[float]:
+        """Cosine similarity of the query to each entry in a partition (all vectors are normalized)"""
+        if numpy is not None and partition:
+            cached = self._matrices.get(key)
+            if cached is None or cached[0] is not partition:
+                try:
+                    cached = self._matrices[key] = (
+                        partition, numpy.array([entry['embedding'] for entry in partition]))
+                except ValueError:  # Embeddings of differing lengths
+                    cached = None
+            if cached is not None and cached[1].shape[1] == len(query):
+                return (cached[1] @ numpy.asarray(query)).tolist()
+        return [_dot(query, entry['embedding']) for entry in partition]
+    
+    def store(self, text: str, model: str, category: str, response: str):
+        """Cache a response for a prompt"""
+        embedding = self._embed(text)
+        if embedding is None:
+            return
+
+        with self._lock:
+            self.entries.append({
+                'key': self._key(text, model, category),
+                'embedding': embedding,
+                'model': model,
+                'category': category,
+                'response': response,
+                'created': time.time()
+            })
+
+            # Drop expired entries first, then the oldest ones beyond capacity
+            cutoff = time.time() - self.ttl
+            self.entries = [entry for entry in self.entries if entry['created'] >= cutoff][-self.max_entries:]
+            self._reindex()
+            self._dirty = True
+    
+    def discard(self, model: str, category: str, response: str):
+        """Drop every cached copy of a response for a model and task category"""
+        response = response.strip()
+        with self._lock:
+            kept = [entry for entry in self.entries
+                    if (entry['model'], entry['category']) != (model, category) or entry['response'].strip() != response]
+            if len(kept) != len(self.entries):
+                self.entries = kept
+                self._reindex()
+                self._dirty = True
+    
+    def flush(self):
+        """Persist cache changes to disk, if there are any"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
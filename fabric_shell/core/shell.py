@@ -2,30 +2,105 @@
 Updated main AI Fabric Shell application class with enhanced command handling and fixed confirmation flow
 """
 
+import atexit
 import os
 import platform
-import psutil
-import ollama
 import re
+import shlex
+import subprocess
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
-from rich.console import Console
+from types import MappingProxyType
+from typing import ClassVar, Dict, Any, Iterator, List, Mapping, Optional, Tuple
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from ..models.manager import ModelManager
-from ..plugins.manager import PluginManager
+from ..models.manager import ModelManager, OLLAMA_KEEP_ALIVE, OLLAMA_OPTIONS
+from ..plugins.manager import PluginManager, PluginMeta
 from ..rendering.renderer import ResponseRenderer
 from ..core.system_info import SystemInfo
-from ..utils.commands import CommandExecutor
+from ..core.response_cache import ExactResponseCache, SemanticResponseCache
+from ..core.prompts import render_prompt
+from ..utils.commands import CommandExecutor, CommandHistoryManager
 from ..utils.extractors import TextExtractor
-
-console = Console()
+from ..utils.console import console
+
+# Disk usage barely changes during a session, so it is re-sampled at most this often
+DISK_USAGE_TTL = 30.0
+
+# Repeated status calls within this many seconds reuse the same metrics snapshot
+METRICS_TTL = 1.0
+
+# Status icons indexed by how many of a metric's (warning, critical) thresholds are reached
+_STATUS_ICONS = ("🟢", "🟡", "🔴")
+_THRESHOLDS = MappingProxyType({
+    'cpu': (60, 80),
+    'mem': (60, 80),
+    'disk': (75, 90)
+})
+
+# Ollama embedding model used for the semantic response cache
+EMBEDDING_MODEL = "nomic-embed-text"
+
+# Earlier messages resent with each chat-mode turn (user and assistant messages count separately)
+CHAT_HISTORY_MESSAGES = 20
+
+# Number of exact prompt/response pairs kept, and how long they stay valid across sessions
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+
+# Analyses run by `status --deep`: prompt template, task category for model choice, panel title
+_STATUS_ASPECTS = (
+    ('status', 'performance', "Performance"),
+    ('status_security', 'security', "Security"),
+    ('status_health', 'analysis', "Health"),
+)
+
+# Command vocabulary named in one-liner prompts, per shell
+_SHELL_CONTEXTS = MappingProxyType({
+    "powershell": "PowerShell cmdlets",
+    "bash": "bash/Unix utilities",
+    "zsh": "zsh/Unix utilities",
+    "fish": "fish shell commands",
+    "cmd": "Windows CMD commands"
+})
+
+# Plugin category -> model recommendation task type
+_CATEGORY_MAPPING = MappingProxyType({
+    'development': 'code',
+    'code': 'code',
+    'security': 'security',
+    'performance': 'performance',
+    'automation': 'quick',
+    'containers': 'code',
+    'system': 'analysis'
+})
+
+# Persistent input history shared by all interactive prompts
+HISTORY_FILE = Path.home() / ".fabric_shell" / "history"
+
+def _truncate(text: str, width: int) -> str:
+    """Cut text to width characters, marking the cut with '...'"""
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+@lru_cache(maxsize=512)
+def _has_plugin_files(location: str) -> bool:
+    """Check a directory for YAML files with one scan, stopping at the first match (memoized)"""
+    try:
+        with os.scandir(location) as entries:
+            return any(entry.name.endswith(('.yml', '.yaml')) for entry in entries)
+    except OSError:  # Missing or unreadable directory
+        return False
 
 class AIFabricShell:
     """Main application class with enhanced Markdown rendering and command history"""
     
+    # Resolved plugins directory, shared by every shell created in this process
+    _plugins_dir_cache: ClassVar[Optional[Path]] = None
+    
     def __init__(self, model: str = "llama3.1"):
         """
         Initialize the AI Fabric Shell application.
@@ -40,8 +115,9 @@ class AIFabricShell:
                 - `~/.fabric_shell/plugins`
             2. Tests the Ollama connection and switches to the specified model if it exists.
         """
-        self.model_manager = ModelManager()
+        self.model_manager = ModelManager()  # Detects models in the background while startup continues
         self.system_info = SystemInfo()
+        self._snapshot_system_info()
         
         # Find plugins directory - try multiple locations
         plugins_dir = self._find_plugins_directory()
@@ -50,18 +126,83 @@ class AIFabricShell:
         self.renderer = ResponseRenderer()
         self.command_executor = CommandExecutor()  # Now enhanced by default
         self.text_extractor = TextExtractor()
+        # Bound once; every AI response goes through one of these
+        self._extract_command = self.text_extractor.extract_clean_command
+        self._extract_code_blocks = self.text_extractor.extract_code_blocks
         
         self.platform = platform.system().lower()
         self.current_shell = self._detect_shell()
         
+        # Background workers so slow I/O can overlap with UI work
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fabric-ai")
+        
+        # Prime the CPU sampler (and import psutil) off the startup path
+        self._executor.submit(self._prime_cpu_sampler)
+        self._disk_usage = None
+        self._disk_usage_time = 0.0
+        self._metrics: Optional[Tuple[float, float, float]] = None
+        self._metrics_time = 0.0
+        
+        # Optimal model per plugin, resolved once and reset when the model changes
+        self._optimal_models: Dict[str, str] = {}
+        self._plugin_rows: Dict[str, Tuple[str, str, str]] = {}
+        self._model_generation = -1
+        self._categories_summary: Tuple[Optional[Mapping[str, Tuple[str, ...]]], str] = (None, "")
+        
+        # Formatted rows for the last history entries, extended as commands are added
+        self._history_rows: List[Tuple[str, str, str, str, str]] = []
+        self._history_rows_source: Tuple[int, int] = (0, 0)
+        # The rendered table, reprinted as-is until an entry is added (keyed on the newest row id)
+        self._history_table: Tuple[Tuple[int, int], Any] = ((0, 0), None)
+        
         # Set initial model
-        if model in self.model_manager.available_models:
+        if model in self.model_manager.available_set:
             self.model_manager.current_model = model
         
+        # Constant per session: cache the one-liner shell context and quick model
+        self._shell_context_str = _SHELL_CONTEXTS.get(self.current_shell, "shell commands")
+        
+        # LRU of exact (model, prompt) matches, toggled with `set cache` / `set nocache`
+        self._exact_cache = ExactResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+        atexit.register(self._exact_cache.flush)
+        self._cache_enabled = True
+        self._stream_cached_at: Optional[float] = None
+        
+        # Built-in commands and their aliases, dispatched by the lowercased first word
+        self._commands = {
+            'quit': self._cmd_quit, 'exit': self._cmd_quit, 'q': self._cmd_quit,
+            'help': self._cmd_help, 'h': self._cmd_help,
+            'list': self._cmd_list, 'ls': self._cmd_list,
+            'models': self._cmd_models,
+            'switch': self._cmd_switch,
+            'status': self._cmd_status,
+            'history': self._cmd_history, 'hist': self._cmd_history,
+            'chat': self._cmd_chat,
+            'run': self._cmd_run,
+            'cmd': self._cmd_oneliner,
+            'troubleshoot': self._cmd_troubleshoot, 'fix': self._cmd_troubleshoot,
+            'debug': self._cmd_debug,
+            'set': self._cmd_set,
+            'refresh': self._cmd_refresh,
+            'reload': self._cmd_reload
+        }
+        
+        self._setup_line_editing()
+        
         self._test_ollama()
+        self._sync_model_caches()
+        self.response_cache = self._init_response_cache()
+    
+    @property
+    def client(self):
+        """Shared keep-alive connection to Ollama"""
+        return self.model_manager.client
     
     def _find_plugins_directory(self) -> Path:
         """Find the plugins directory in various possible locations"""
+        if AIFabricShell._plugins_dir_cache is not None:
+            return AIFabricShell._plugins_dir_cache
+        
         # Get the directory where run.py or main.py is located
         possible_locations = [
             Path.cwd() / "plugins",  # Current working directory
@@ -71,13 +212,15 @@ class AIFabricShell:
         ]
         
         for location in possible_locations:
-            if location.exists() and any(location.glob("*.y*ml")):
+            if _has_plugin_files(str(location)):
                 console.print(f"[green]Found plugins directory: {location}[/green]")
+                AIFabricShell._plugins_dir_cache = location
                 return location
         
         # Default: create in current working directory
         default_location = Path.cwd() / "plugins"
         console.print(f"[yellow]No existing plugins found, using: {default_location}[/yellow]")
+        AIFabricShell._plugins_dir_cache = default_location
         return default_location
     
     def _detect_shell(self) -> str:
@@ -91,6 +234,64 @@ class AIFabricShell:
                 return shell_type
         return "bash"
     
+    def _setup_line_editing(self):
+        """Enable persistent history and command completion for all prompts, where readline exists"""
+        try:
+            import readline
+        except ImportError:  # Not available on plain Windows Python
+            return
+        
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except OSError:
+            pass
+        readline.set_history_length(1000)
+        
+        commands = sorted(self._commands)
+        # Keyed by handler so aliases share completions; choices are read when completing,
+        # so reloaded plugins and re-detected models show up
+        arguments = {
+            self._cmd_run: lambda: self.plugin_manager.list_plugins(),
+            self._cmd_switch: lambda: self.model_manager.available_models,
+            self._cmd_list: lambda: sorted(self.plugin_manager.get_plugins_by_category()),
+            self._cmd_oneliner: lambda: ['--parallel'],
+            self._cmd_status: lambda: ['--deep'],
+            self._cmd_set: lambda: ['cache', 'nocache'],
+        }
+        matches: List[str] = []
+        
+        def complete(text: str, state: int):
+            if state == 0:
+                # Complete the command word first, then the argument of known commands
+                words = readline.get_line_buffer()[:readline.get_begidx()].split()
+                if not words:
+                    candidates = commands
+                elif len(words) == 1 and self._commands.get(words[0].lower().rstrip('!')) in arguments:
+                    candidates = arguments[self._commands[words[0].lower().rstrip('!')]]()
+                else:
+                    candidates = ()
+                matches[:] = [candidate for candidate in candidates if candidate.startswith(text)]
+            return matches[state] if state < len(matches) else None
+        
+        readline.set_completer(complete)
+        # Split only on whitespace so names such as 'llama3.1:8b' or 'log-analyzer' complete whole
+        readline.set_completer_delims(' \t\n')
+        if 'libedit' in (readline.__doc__ or ''):
+            readline.parse_and_bind('bind ^I rl_complete')
+        else:
+            readline.parse_and_bind('tab: complete')
+        
+        atexit.register(self._save_line_history, readline)
+    
+    @staticmethod
+    def _save_line_history(readline):
+        """Write the prompt history back to disk on exit"""
+        try:
+            HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+            readline.write_history_file(HISTORY_FILE)
+        except OSError as e:
+            console.print(f"[yellow]Warning: Could not save input history: {e}[/yellow]")
+    
     def _test_ollama(self):
         """Test Ollama connection and model availability"""
         try:
@@ -100,7 +301,7 @@ class AIFabricShell:
             
             # Check if current model exists
             current_model = self.model_manager.current_model
-            if not any(current_model in model for model in self.model_manager.available_models):
+            if not self.model_manager.has_model(current_model):
                 console.print(f"[yellow]Model '{current_model}' not found.[/yellow]")
                 self.show_models()
                 model_choice = Prompt.ask("Select a model", 
@@ -108,9 +309,10 @@ class AIFabricShell:
                                         default=self.model_manager.available_models[0])
                 self.model_manager.switch_model(model_choice)
             
-            # Test chat functionality
-            ollama.chat(model=self.model_manager.current_model, 
-                       messages=[{'role': 'user', 'content': 'test'}])
+            # Listing the models already proved the server is reachable; a test chat
+            # (which loads the model) only runs when strict checking is requested
+            if os.environ.get('FABRIC_SHELL_STRICT_HEALTHCHECK') == '1':
+                self._send_chat(self.model_manager.current_model, [{'role': 'user', 'content': 'test'}])
             console.print(f"[green]✓[/green] Connected to Ollama (model: {self.model_manager.current_model})")
             
         except Exception as e:
@@ -121,172 +323,334 @@ class AIFabricShell:
             console.print("3. Pull model: ollama pull llama3.1")
             raise SystemExit(1)
     
-    def _chat_with_ai(self, prompt: str, context: str = "", model: str = None) -> str:
+    @staticmethod
+    def _prime_cpu_sampler():
+        """Take the initial CPU sample so show_status can read usage without blocking"""
+        import psutil
+        psutil.cpu_percent(interval=None)
+    
+    def _init_response_cache(self):
+        """Enable the semantic response cache when an embedding model is installed"""
+        if EMBEDDING_MODEL not in self.model_manager.name_prefix_index:
+            return None
+        
+        def embed(text: str):
+            response = self.client.embeddings(model=EMBEDDING_MODEL, prompt=text)
+            return response['embedding'] if isinstance(response, dict) else response.embedding
+        
+        cache = SemanticResponseCache(embed)
+        atexit.register(cache.flush)  # Written once at shutdown for cross-session hits
+        return cache
+    
+    def _compute_quick_model(self) -> str:
+        """Resolve the model used for quick one-liner generation"""
+        return self.model_manager.get_best_model('quick', self.model_manager.current_model)
+    
+    def _sync_model_caches(self):
+        """Drop model choices derived from an older model list or current model"""
+        if self._model_generation == self.model_manager.generation:
+            return
+        self._model_generation = self.model_manager.generation
+        # Cached model choices fall back to the current model when nothing is recommended
+        self._quick_model = self._compute_quick_model()
+        self._optimal_models.clear()
+        self._plugin_rows.clear()
+    
+    def _snapshot_system_info(self):
+        """Precompute the system-context prefixes that lead every prompt and the available tools"""
+        self._available_tools = tuple(sorted(
+            tool for tool, available in self.system_info.available_tools.items() if available
+        ))
+        self._system_context = self.system_info.get_context_string()
+        self._compact_system_context = self.system_info.get_compact_context_string()
+    
+    def _build_messages(self, prompt: str, context: str = "", compact: bool = False,
+                        history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+        """Lead with the system context as a fixed system message, then any history and the prompt"""
+        # Short generations get the compact context so it does not dwarf the task itself
+        system = self._compact_system_context if compact else self._system_context
+        user = "".join((context, "\n\n", prompt)) if context else prompt
+        return [{'role': 'system', 'content': system}, *(history or ()), {'role': 'user', 'content': user}]
+    
+    @staticmethod
+    def _cache_key(model: str, messages: List[Dict[str, str]]) -> str:
+        """Exact-cache key for a model and the messages it is sent"""
+        return ExactResponseCache.key(model, "\n\n".join(message['content'] for message in messages))
+    
+    def _send_chat(self, model: str, messages: List[Dict[str, str]], stream: bool = False):
+        """Send a chat request with the shared options, keeping the model (and its prompt cache) loaded"""
+        # Every request starts with the same system message, so Ollama only evaluates what follows it
+        return self.client.chat(model=model, messages=messages, stream=stream,
+                                options=OLLAMA_OPTIONS, keep_alive=OLLAMA_KEEP_ALIVE)
+    
+    def _lookup_response(self, key: str, semantic_text: Optional[str], model: str,
+                         category: str) -> Optional[Tuple[str, float]]:
+        """Return (response, created) from the exact cache, falling back to the semantic cache"""
+        cached = self._exact_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Near-duplicate requests for the same model and task category reuse earlier answers.
+        # Only the user-supplied text is compared: prompts rendered from one template share
+        # almost all their text, so whole prompts for different tasks would look alike
+        if self.response_cache and semantic_text:
+            return self.response_cache.lookup(semantic_text, model, category)
+        return None
+    
+    def _remember_response(self, key: str, semantic_text: Optional[str], model: str, category: str,
+                           content: str):
+        """Store a response in the exact cache and, when it has a user-supplied text, the semantic cache"""
+        self._exact_cache.put(key, content)
+        
+        if self.response_cache and semantic_text:
+            self.response_cache.store(semantic_text, model, category, content)
+    
+    def _forget_response(self, prompt: str, model: Optional[str], category: str, response: str,
+                         compact: bool = False):
+        """Evict a response whose command the user rejected or that failed, so the request is answered afresh"""
+        use_model = model or self.model_manager.current_model
+        self._exact_cache.discard(self._cache_key(use_model, self._build_messages(prompt, "", compact)))
+        if self.response_cache:
+            self.response_cache.discard(use_model, category, response)
+    
+    @staticmethod
+    def _command_rejected(result: Dict[str, Any]) -> bool:
+        """Whether a generated command was declined, failed, or did not accomplish the task"""
+        return not result.get('success') or bool(result.get('user_confirmed_failure'))
+    
+    def _chat_with_ai(self, prompt: str, context: str = "", model: str = None,
+                      category: str = "general", cacheable: bool = True, compact: bool = False,
+                      semantic_text: Optional[str] = None) -> str:
         """Send prompt to AI with system context and handle response formats"""
+        return self._chat_with_ai_cached(prompt, context, model, category, cacheable, compact, semantic_text)[0]
+    
+    def _chat_with_ai_cached(self, prompt: str, context: str = "", model: str = None,
+                             category: str = "general", cacheable: bool = True, compact: bool = False,
+                             semantic_text: Optional[str] = None) -> Tuple[str, Optional[float]]:
+        """Like _chat_with_ai, also returning when the response was cached if it came from a cache.
+        
+        semantic_text is the user-supplied part of the request (a task, an error); without it
+        only the exact cache is used.
+        """
         # Use specified model or current model
         use_model = model or self.model_manager.current_model
         
         # Add system context to all AI interactions
-        system_context = self.system_info.get_context_string()
-        full_context = f"{system_context}\n\n{context}" if context else system_context
-        full_prompt = f"{full_context}\n\n{prompt}" if full_context else prompt
+        messages = self._build_messages(prompt, context, compact)
+        
+        # Time-sensitive prompts (live metrics) opt out of caching; with reuse turned off,
+        # fresh answers are still stored so they replace older cached ones
+        if cacheable:
+            key = self._cache_key(use_model, messages)
+        if cacheable and self._cache_enabled:
+            cached = self._lookup_response(key, semantic_text, use_model, category)
+            if cached is not None:
+                return cached
         
         try:
-            response = ollama.chat(model=use_model, messages=[{
-                'role': 'user', 'content': full_prompt
-            }])
+            response = self._send_chat(use_model, messages)
             
             # Handle various response formats
             if isinstance(response, dict):
-                return (response.get('message', {}).get('content') or 
-                       response.get('response') or response.get('content') or str(response))
+                content = (response.get('message', {}).get('content') or 
+                          response.get('response') or response.get('content') or str(response))
             elif hasattr(response, 'message') and hasattr(response.message, 'content'):
-                return response.message.content
-            return str(response)
+                content = response.message.content
+            else:
+                content = str(response)
             
         except Exception as e:
-            return f"AI communication error: {e}"
+            return f"AI communication error: {e}", None
+        
+        if cacheable:
+            self._remember_response(key, semantic_text, use_model, category, content)
+        return content, None
     
-    def generate_oneliner(self, task: str, suggested_model: str = None):
-        """Generate and execute one-liner command with enhanced options"""
-        # Get model recommendations
-        recommendations = self.model_manager.get_model_recommendations('quick')
+    def _chat_with_ai_stream(self, prompt: str, context: str = "", model: str = None,
+                             category: str = "general", cacheable: bool = True, compact: bool = False,
+                             history: Optional[List[Dict[str, str]]] = None,
+                             semantic_text: Optional[str] = None) -> Iterator[str]:
+        """Stream the AI response in chunks as Ollama generates it"""
+        use_model = model or self.model_manager.current_model
+        messages = self._build_messages(prompt, context, compact, history)
+        
+        # Answers that depend on earlier conversation turns are not reusable on their own
+        cacheable = cacheable and not history
+        if cacheable:
+            key = self._cache_key(use_model, messages)
+        if cacheable and self._cache_enabled:
+            cached = self._lookup_response(key, semantic_text, use_model, category)
+            if cached is not None:
+                self._stream_cached_at = cached[1]
+                yield cached[0]
+                return
+        
+        parts = []
+        try:
+            for chunk in self._send_chat(use_model, messages, stream=True):
+                content = chunk['message']['content'] or ''
+                if content:
+                    parts.append(content)
+                    yield content
+        except Exception as e:
+            yield ("\n\n" if parts else "") + f"AI communication error: {e}"
+            return
         
-        # Use suggested model, best recommendation, or current model
-        use_model = suggested_model
-        if not use_model and recommendations:
-            use_model = recommendations[0][0]
-        if not use_model:
-            use_model = self.model_manager.current_model
+        if cacheable:
+            self._remember_response(key, semantic_text, use_model, category, "".join(parts))
+    
+    def _stream_ai_response(self, prompt: str, title: str, border_style: str, context: str = "",
+                            model: str = None, category: str = "general", cacheable: bool = True,
+                            history: Optional[List[Dict[str, str]]] = None,
+                            semantic_text: Optional[str] = None) -> str:
+        """Stream an AI response into a live panel and return the full text"""
+        self._stream_cached_at = None
+        response = self.renderer.render_ai_stream(
+            self._chat_with_ai_stream(prompt, context, model, category, cacheable, history=history,
+                                      semantic_text=semantic_text),
+            title, border_style
+        )
+        if self._stream_cached_at is not None:
+            self.renderer.render_cache_notice(self._stream_cached_at)
+        return response
+    
+    def _explain_with_ai(self, prompt: str) -> None:
+        """Stream a command explanation for the executor's explain option, with the cache notice when reused"""
+        self._stream_ai_response(prompt, "Command Explanation", "blue")
+    
+    def _chat_with_ai_multi(self, prompt: str, models: List[str], category: str = "general",
+                            semantic_text: Optional[str] = None) -> Tuple[str, str, Optional[float]]:
+        """Query several models at once and return the first response containing a command,
+        with its model and, if it came from a cache, when it was cached"""
+        executor = ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="fabric-multi")
+        futures = {executor.submit(self._chat_with_ai_cached, prompt, "", model, category,
+                                   semantic_text=semantic_text): model
+                   for model in models}
+        
+        first = None
+        try:
+            for future in as_completed(futures):
+                (response, cached_at), model = future.result(), futures[future]
+                response = response.strip()
+                if first is None:
+                    first = (response, model, cached_at)
+                if (not response.startswith("AI communication error")
+                        and self._extract_command(response)):
+                    return response, model, cached_at
+        finally:
+            # Slower models keep running in the background; their answers still reach the cache
+            executor.shutdown(wait=False, cancel_futures=True)
+        return first
+    
+    def generate_oneliner(self, task: str, suggested_model: str = None, parallel: bool = False):
+        """Generate and execute one-liner command with enhanced options"""
+        # Use suggested model or the cached quick-command model
+        self._sync_model_caches()
+        use_model = suggested_model or self._quick_model
         
         # Show model choice if different from current
         if use_model != self.model_manager.current_model:
             console.print(f"[dim]Using model: {use_model} (optimized for quick commands)[/dim]")
         
-        shell_contexts = {
-            "powershell": "PowerShell cmdlets",
-            "bash": "bash/Unix utilities", 
-            "zsh": "zsh/Unix utilities",
-            "fish": "fish shell commands",
-            "cmd": "Windows CMD commands"
-        }
-        
-        context = shell_contexts.get(self.current_shell, "shell commands")
-        
         # Get historical context for similar commands
         historical_context = self.command_executor.get_command_context(task)
         
-        prompt = f"""Generate a single-line {context} command to: {task}
-
-Requirements:
-- Single line only
-- Use {self.current_shell} syntax
-- Production-ready and safe
-- Respond with ONLY the command (no explanation/markdown)
-
-{historical_context}"""
+        prompt = render_prompt('oneliner', shell=self.current_shell, shell_context=self._shell_context_str,
+                               history=historical_context, task=task)
         
         console.print(Panel(f"Generating {self.current_shell.upper()} command for: {task}",
                           title="[cyan]Command Generator[/cyan]", border_style="cyan"))
         
+        category = f"oneliner:{self.current_shell}"
         with console.status("[yellow]AI generating...", spinner="dots"):
-            response = self._chat_with_ai(prompt, model=use_model).strip()
+            response, cached_at = self._chat_with_ai_cached(
+                prompt, model=use_model, category=category, compact=True, semantic_text=task
+            )
+        response = response.strip()
+        if cached_at is not None:
+            self.renderer.render_cache_notice(cached_at)
         
-        command = self.text_extractor.extract_clean_command(response)
+        command = self._extract_command(response)
         
         if command:
             # Use enhanced executor with y/n/e options
             result = self.command_executor.execute_command_with_options(
-                command, task, self.current_shell, self._chat_with_ai
+                command, task, self.current_shell, self._explain_with_ai
             )
+            # A rejected command must not be served again for the same task
+            if self._command_rejected(result):
+                self._forget_response(prompt, use_model, category, response, compact=True)
             
             # Check if user confirmed the command didn't work as expected
             if result.get('user_confirmed_failure'):
+                alternative_prompt = render_prompt('alternative', shell=self.current_shell, task=task,
+                                                   command=command, output=result.get('stdout', 'No output'))
+                alternative_category = f"alternative:{self.current_shell}"
+                
+                # Start generating while the user decides; a declined answer still lands in the cache
+                alternative_future = self._executor.submit(
+                    self._chat_with_ai_cached, alternative_prompt, category=alternative_category,
+                    compact=True, semantic_text=f"{task}\n\n{command}"
+                )
+                
                 if Confirm.ask("[yellow]Would you like AI to generate an alternative approach?[/yellow]"):
-                    alternative_prompt = f"""The previous command didn't accomplish the user's goal. Generate an alternative approach.
-
-## Original Task
-{task}
-
-## Previous Command (didn't work as expected)
-```{self.current_shell}
-{command}
-```
-
-## Previous Output
-```
-{result.get('stdout', 'No output')}
-```
-
-Please provide a different approach or command to accomplish: {task}
-
-Requirements:
-- Use a completely different method if possible
-- Single line command only
-- Use {self.current_shell} syntax
-- Respond with ONLY the command (no explanation/markdown)"""
-                    
                     with console.status("[yellow]AI generating alternative...", spinner="dots"):
-                        alternative_response = self._chat_with_ai(alternative_prompt).strip()
+                        alternative_response, cached_at = alternative_future.result()
+                    alternative_response = alternative_response.strip()
+                    if cached_at is not None:
+                        self.renderer.render_cache_notice(cached_at)
                     
-                    alternative_command = self.text_extractor.extract_clean_command(alternative_response)
+                    alternative_command = self._extract_command(alternative_response)
                     if alternative_command:
                         console.print(f"\n[cyan]Alternative approach:[/cyan]")
                         result = self.command_executor.execute_command_with_options(
-                            alternative_command, f"Alternative: {task}", self.current_shell, self._chat_with_ai
+                            alternative_command, f"Alternative: {task}", self.current_shell, self._explain_with_ai
                         )
+                        if self._command_rejected(result):
+                            self._forget_response(alternative_prompt, None, alternative_category,
+                                                  alternative_response, compact=True)
             
             # Only offer troubleshooting for actual technical errors
             elif result.get('error') or (result.get('stderr') and not result.get('success')):
                 error = result.get('stderr') or result.get('error')
                 if Confirm.ask("[yellow]AI troubleshoot this error?[/yellow]"):
-                    self._troubleshoot_error(command, error, task)
+                    self._troubleshoot_error(command, error, task, parallel)
         else:
             console.print("[red]Could not extract valid command from AI response[/red]")
     
-    def _troubleshoot_error(self, command: str, error: str, task: str):
-        """AI troubleshooting for failed commands"""
-        prompt = f"""A {self.current_shell} command failed. Analyze the error and provide a solution.
-
-## Original Task
-{task}
-
-## Failed Command
-```{self.current_shell}
-{command}
-```
-
-## Error Output
-```
-{error}
-```
-
-## System Context
-- Shell: {self.current_shell}
-- Platform: {self.platform}
-
-Please provide:
-1. **Root Cause Analysis** - What went wrong?
-2. **Corrected Command** - Fixed version that should work
-3. **Alternative Approaches** - Other ways to accomplish the task
-
-Format your response with clear sections and use code blocks for commands."""
+    def _troubleshoot_error(self, command: str, error: str, task: str, parallel: bool = False):
+        """AI troubleshooting for failed commands, optionally racing the analysis models"""
+        prompt = render_prompt('troubleshoot', shell=self.current_shell, platform=self.platform,
+                               task=task, command=command, error=error)
         
         console.print(Panel("🔍 AI troubleshooting...", title="[yellow]Troubleshooting[/yellow]", border_style="yellow"))
         
-        with console.status("[yellow]Analyzing...", spinner="dots"):
-            response = self._chat_with_ai(prompt).strip()
-        
-        # Use enhanced Markdown rendering
-        self.renderer.render_ai_response(response, "Troubleshooting Analysis", "blue")
+        # Similar answers are only reused for a similar command failing with a similar error
+        category, semantic_text = f"troubleshoot:{self.current_shell}", f"{command}\n\n{error}"
+        models = [model for model, _ in self.model_manager.get_model_recommendations('analysis')]
+        use_model = None
+        if parallel and len(models) > 1:
+            with console.status(f"[yellow]Analyzing with {len(models)} models...", spinner="dots"):
+                response, winner, cached_at = self._chat_with_ai_multi(prompt, models, category=category,
+                                                                       semantic_text=semantic_text)
+            console.print(f"[dim]Using analysis from: {winner}[/dim]")
+            use_model = winner
+            self.renderer.render_ai_response(response, "Troubleshooting Analysis", "blue")
+            if cached_at is not None:
+                self.renderer.render_cache_notice(cached_at)
+        else:
+            response = self._stream_ai_response(prompt, "Troubleshooting Analysis", "blue",
+                                                category=category, semantic_text=semantic_text).strip()
         
-        corrected = self.text_extractor.extract_clean_command(response)
+        corrected = self._extract_command(response)
         
         if corrected and Confirm.ask("[green]Try corrected command?[/green]"):
             # Use execute_command_with_options which handles its own confirmation flow
             result = self.command_executor.execute_command_with_options(
-                corrected, f"Fixed: {task}", self.current_shell, self._chat_with_ai
+                corrected, f"Fixed: {task}", self.current_shell, self._explain_with_ai
             )
+            if self._command_rejected(result):
+                self._forget_response(prompt, use_model, category, response)
     
     def run_plugin(self, plugin_name: str):
         """Execute a plugin with optimal model selection"""
@@ -295,83 +659,162 @@ Format your response with clear sections and use code blocks for commands."""
             console.print(f"[red]Plugin '{plugin_name}' not found[/red]")
             return
         
+        meta = self.plugin_manager.get_plugin_meta(plugin_name)
+        
         # Determine best model for this plugin
-        use_model = self._get_optimal_model_for_plugin(plugin_name, plugin)
+        use_model = self._get_optimal_model_for_plugin(plugin_name, meta)
         
         # Show model choice if different from current
         if use_model != self.model_manager.current_model:
             model_info = self.model_manager.model_info.get(use_model, {})
             console.print(f"[dim]Using model: {use_model} - {model_info.get('description', '')}[/dim]")
         
-        # Collect parameter values
+        # Plugins flagged batch_prompt collect every parameter in a single editor form
+        edited = self._edit_plugin_parameters(plugin_name, meta) if meta.batch_prompt else None
+        
+        # Collect parameter values; file contents are read in the background
+        # while the remaining parameters are prompted for
         values = {}
-        for param_name, config in plugin.get('parameters', {}).items():
+        for param_name, config in meta.parameters.items():
             prompt_text = config.get('prompt', f"Enter {param_name}")
+            is_file = config.get('type') == 'file'
             
-            if config.get('type') == 'file':
-                file_path = Prompt.ask(prompt_text)
-                if os.path.exists(file_path):
-                    with open(file_path, 'r') as f:
-                        values[param_name] = f.read()
-                else:
-                    console.print(f"[red]File not found: {file_path}[/red]")
-                    return
+            if edited is not None:
+                answer = edited.get(param_name)
+                answer = '' if answer is None else str(answer)
+            elif is_file:
+                answer = Prompt.ask(prompt_text)
             else:
-                default = config.get('default')
-                if param_name == 'script_type' and not default:
-                    default = self.current_shell
-                values[param_name] = Prompt.ask(prompt_text, default=default)
+                answer = Prompt.ask(prompt_text, default=self._parameter_default(param_name, config))
+            
+            if is_file:
+                values[param_name] = self._executor.submit(self._read_plugin_file, answer)
+            else:
+                values[param_name] = answer
+        
+        for param_name, value in values.items():
+            if isinstance(value, Future):
+                try:
+                    values[param_name] = value.result()
+                except OSError as e:
+                    console.print(f"[red]File not found: {e.filename}[/red]")
+                    return
         
         # Build and execute AI prompt
         ai_prompt = plugin['prompt'].format(**values)
         context = plugin.get('context', '').format(**values) if plugin.get('context') else ''
         
         console.print(Panel(f"[bold]Plugin:[/bold] {plugin_name}\n"
-                          f"[bold]Description:[/bold] {plugin.get('description', 'N/A')}\n"
-                          f"[bold]Category:[/bold] {plugin.get('category', 'general')}\n"
+                          f"[bold]Description:[/bold] {meta.description}\n"
+                          f"[bold]Category:[/bold] {meta.category}\n"
                           f"[bold]Model:[/bold] {use_model}",
                           title="[cyan]Executing Plugin[/cyan]", border_style="blue"))
         
-        with console.status("[yellow]AI processing...", spinner="dots"):
-            ai_response = self._chat_with_ai(ai_prompt, context, model=use_model)
-        
-        # Use enhanced Markdown rendering for plugin responses
-        self.renderer.render_ai_response(ai_response, f"AI Response - {plugin_name}", "green")
+        # Stream the plugin response with enhanced Markdown rendering
+        ai_response = self._stream_ai_response(
+            ai_prompt, f"AI Response - {plugin_name}", "green", context, model=use_model,
+            category=f"plugin:{plugin_name}", semantic_text=self._plugin_semantic_text(meta.parameters, values)
+        )
         
         # Handle post-processing
         if plugin.get('post_process', {}).get('type') == 'execute':
             self._extract_and_execute(ai_response, plugin_name, values)
     
-    def _get_optimal_model_for_plugin(self, plugin_name: str, plugin: Dict[str, Any]) -> str:
-        """Determine the optimal model for a plugin"""
+    @staticmethod
+    def _plugin_semantic_text(parameters: Mapping[str, Dict[str, Any]], values: Dict[str, Any]) -> Optional[str]:
+        """The user-supplied part of a plugin request: its parameter values, without the plugin's template
+        
+        Plugins that read files get None, so only the exact cache applies: an edited file
+        embeds close to its previous version and would be answered with the stale response.
+        """
+        if any(config.get('type') == 'file' for config in parameters.values()):
+            return None
+        return "\n".join(f"{name}: {value}" for name, value in sorted(values.items()))
+    
+    def _parameter_default(self, param_name: str, config: Dict[str, Any]) -> Any:
+        """Default value offered for a plugin parameter"""
+        default = config.get('default')
+        if param_name == 'script_type' and not default:
+            default = self.current_shell
+        return default
+    
+    def _edit_plugin_parameters(self, plugin_name: str, meta: PluginMeta):
+        """Collect all plugin parameters in one $EDITOR session; None if the form cannot be used"""
+        import yaml
+        
+        lines = [f"# Parameters for {plugin_name}: fill in the values, save and close the editor"]
+        for param_name, config in meta.parameters.items():
+            lines.append(f"\n# {config.get('prompt', f'Enter {param_name}')}")
+            default = None if config.get('type') == 'file' else self._parameter_default(param_name, config)
+            lines.append(yaml.safe_dump({param_name: default}, default_flow_style=False,
+                                        allow_unicode=True).rstrip())
+        
+        editor = (os.environ.get('VISUAL') or os.environ.get('EDITOR')
+                  or ('notepad' if self.platform == 'windows' else 'vi'))
+        fd, form_path = tempfile.mkstemp(prefix=f"fabric-{plugin_name}-", suffix=".yaml")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            subprocess.run(self._editor_command(editor) + [form_path], check=True)
+            with open(form_path, 'r', encoding='utf-8') as f:
+                edited = yaml.safe_load(f)
+        except (OSError, ValueError, subprocess.CalledProcessError, yaml.YAMLError) as e:
+            console.print(f"[yellow]Parameter form unavailable ({e}); asking for each parameter instead[/yellow]")
+            return None
+        finally:
+            try:
+                os.unlink(form_path)
+            except OSError:
+                pass
+        
+        if not isinstance(edited, dict):
+            console.print("[yellow]Parameter form was empty; asking for each parameter instead[/yellow]")
+            return None
+        return edited
+    
+    @staticmethod
+    def _editor_command(editor: str) -> List[str]:
+        """Split an $EDITOR value into arguments; raises ValueError on unbalanced quotes"""
+        if os.name != 'nt':
+            return shlex.split(editor)
+        # Non-POSIX splitting keeps the backslashes in paths such as C:\Program Files\...,
+        # but also keeps the quotes around them, which subprocess would escape
+        return [part[1:-1] if len(part) > 1 and part[0] == part[-1] == '"' else part
+                for part in shlex.split(editor, posix=False)]
+    
+    @staticmethod
+    def _read_plugin_file(file_path: str) -> str:
+        """Read a file parameter in one open call (no separate existence check)"""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    
+    def _get_optimal_model_for_plugin(self, plugin_name: str, meta: PluginMeta) -> str:
+        """Determine the optimal model for a plugin, memoized per plugin"""
+        self._sync_model_caches()
+        optimal_model = self._optimal_models.get(plugin_name)
+        if optimal_model is None:
+            optimal_model = self._optimal_models[plugin_name] = self._resolve_optimal_model(meta)
+        return optimal_model
+    
+    def _resolve_optimal_model(self, meta: PluginMeta) -> str:
+        """Resolve the optimal model for a plugin from its metadata"""
         # 1. Check if plugin specifies a preferred model
-        preferred_model = plugin.get('preferred_model')
-        if preferred_model and preferred_model in self.model_manager.available_models:
+        preferred_model = meta.preferred_model
+        if preferred_model and preferred_model in self.model_manager.available_set:
             return preferred_model
         
         # 2. Check if plugin specifies a model category
-        model_category = plugin.get('model_category')
+        model_category = meta.model_category
         if model_category:
-            recommendations = self.model_manager.get_model_recommendations(model_category)
-            if recommendations:
-                return recommendations[0][0]
+            best_model = self.model_manager.get_best_model(model_category)
+            if best_model:
+                return best_model
         
         # 3. Use plugin category to determine best model
-        plugin_category = plugin.get('category', 'general')
-        category_mapping = {
-            'development': 'code',
-            'code': 'code',
-            'security': 'security',
-            'performance': 'performance',
-            'automation': 'quick',
-            'containers': 'code',
-            'system': 'analysis'
-        }
-        
-        task_type = category_mapping.get(plugin_category, 'general')
-        recommendations = self.model_manager.get_model_recommendations(task_type)
-        if recommendations:
-            return recommendations[0][0]
+        task_type = _CATEGORY_MAPPING.get(meta.category, 'general')
+        best_model = self.model_manager.get_best_model(task_type)
+        if best_model:
+            return best_model
         
         # 4. Fallback to current model
         return self.model_manager.current_model
@@ -379,7 +822,7 @@ Format your response with clear sections and use code blocks for commands."""
     def _extract_and_execute(self, response: str, plugin_name: str, plugin_values: Dict[str, Any] = None):
         """Extract and execute code from AI response with enhanced options"""
         # Find code blocks
-        code_blocks = self.text_extractor.extract_code_blocks(response)
+        code_blocks = self._extract_code_blocks(response)
         
         code, language = None, None
         
@@ -390,7 +833,7 @@ Format your response with clear sections and use code blocks for commands."""
         
         # Try raw command extraction for command plugins
         if not code and plugin_name in ['cmd_generator', 'quick_command', 'file_operations']:
-            code = self.text_extractor.extract_clean_command(response)
+            code = self._extract_command(response)
             language = self.current_shell
         
         if code:
@@ -403,7 +846,7 @@ Format your response with clear sections and use code blocks for commands."""
             
             # Use enhanced executor with y/n/e options
             result = self.command_executor.execute_command_with_options(
-                code, task_description, language, self._chat_with_ai
+                code, task_description, language, self._explain_with_ai
             )
             
             # Check if user confirmed the command didn't work as expected
@@ -423,48 +866,17 @@ Format your response with clear sections and use code blocks for commands."""
     
     def _troubleshoot_script_error(self, code: str, error: str, language: str):
         """Troubleshoot script errors with AI"""
-        prompt = f"""A {language} script failed. Analyze and provide a comprehensive solution.
-
-## Failed Script
-```{language}
-{code}
-```
-
-## Error Output
-```
-{error}
-```
-
-## System Context
-- Language: {language}
-- Platform: {self.platform}
-- Shell: {self.current_shell}
-
-Please provide:
-
-### 1. Root Cause Analysis
-What exactly went wrong and why?
-
-### 2. Corrected Script
-Provide a fixed version with proper error handling.
-
-### 3. Alternative Approaches
-Suggest different ways to accomplish the same goal.
-
-### 4. Best Practices
-Tips to prevent similar issues in the future.
-
-Use proper code blocks and clear explanations."""
+        prompt = render_prompt('script_troubleshoot', platform=self.platform, shell=self.current_shell,
+                               language=language, code=code, error=error)
         
         console.print(Panel("🔍 AI analyzing error...", title="[yellow]Troubleshooting[/yellow]", border_style="yellow"))
         
-        with console.status("[yellow]Troubleshooting...", spinner="dots"):
-            response = self._chat_with_ai(prompt)
-        
-        # Use enhanced Markdown rendering
-        self.renderer.render_ai_response(response, "Script Troubleshooting Analysis", "blue")
+        # Stream the analysis; code blocks are extracted from the full text afterwards
+        response = self._stream_ai_response(prompt, "Script Troubleshooting Analysis", "blue",
+                                             category=f"script_troubleshoot:{language}",
+                                             semantic_text=f"{code}\n\n{error}")
         
-        code_blocks = self.text_extractor.extract_code_blocks(response)
+        code_blocks = self._extract_code_blocks(response)
         if code_blocks and Confirm.ask("[green]Try corrected script?[/green]"):
             # Use _extract_and_execute which has its own confirmation flow
             self._extract_and_execute(response, "troubleshooter")
@@ -472,45 +884,18 @@ Use proper code blocks and clear explanations."""
     def quick_troubleshoot(self, issue: str):
         """Quick AI troubleshooting with enhanced formatting"""
         # Use analysis-optimized model
-        recommendations = self.model_manager.get_model_recommendations('analysis')
-        use_model = recommendations[0][0] if recommendations else self.model_manager.current_model
+        use_model = self.model_manager.get_best_model('analysis', self.model_manager.current_model)
         
         if use_model != self.model_manager.current_model:
             console.print(f"[dim]Using model: {use_model} (optimized for analysis)[/dim]")
         
-        prompt = f"""Analyze and troubleshoot the following issue:
-
-## Issue Description
-{issue}
-
-## System Context
-- OS: {self.system_info.os_name}
-- Shell: {self.current_shell}
-- Platform: {self.platform}
-
-Please provide a comprehensive troubleshooting guide with:
-
-### 1. Likely Causes
-What are the most probable reasons for this issue?
-
-### 2. Diagnostic Commands
-Shell commands to gather more information and diagnose the problem.
-
-### 3. Step-by-Step Solutions
-Detailed solutions ranked by likelihood of success.
-
-### 4. Prevention Tips
-How to avoid this issue in the future.
-
-Use proper formatting with code blocks for commands and clear section headers."""
+        prompt = render_prompt('quick_troubleshoot', os_name=self.system_info.os_name,
+                               shell=self.current_shell, platform=self.platform, issue=issue)
         
         console.print(Panel(f"Analyzing: {issue}", title="[yellow]Quick Troubleshoot[/yellow]", border_style="yellow"))
         
-        with console.status("[yellow]AI analyzing...", spinner="dots"):
-            response = self._chat_with_ai(prompt, model=use_model)
-        
-        # Use enhanced Markdown rendering
-        self.renderer.render_ai_response(response, "Troubleshooting Guide", "blue")
+        self._stream_ai_response(prompt, "Troubleshooting Guide", "blue", model=use_model,
+                                 category=f"quick_troubleshoot:{self.current_shell}", semantic_text=issue)
     
     def _handle_unknown_command(self, command: str):
         """Handle unrecognized commands by passing through to shell"""
@@ -526,35 +911,23 @@ Use proper formatting with code blocks for commands and clear section headers.""
     
     def _troubleshoot_passthrough_error(self, command: str, error: str):
         """Troubleshoot failed passthrough commands"""
-        prompt = f"""A {self.current_shell} command failed. Analyze the error and provide a corrected command.
-
-**Failed Command:** {command}
-**Error:** {error}
-**Shell:** {self.current_shell}
-**Platform:** {self.platform}
-
-Provide:
-1. Brief explanation of what went wrong
-2. Corrected command that should work
-3. Alternative approaches if applicable
-
-Format your response with clear sections and code blocks for any commands."""
+        prompt = render_prompt('passthrough', shell=self.current_shell, platform=self.platform,
+                               command=command, error=error)
         
         console.print(Panel("🔍 AI analyzing failed command...", 
                           title="[yellow]Command Troubleshooting[/yellow]", border_style="yellow"))
         
-        with console.status("[yellow]AI troubleshooting...", spinner="dots"):
-            response = self._chat_with_ai(prompt)
-        
-        # Use enhanced Markdown rendering
-        self.renderer.render_ai_response(response, "AI Analysis & Fix", "blue")
+        # Stream the analysis; the corrected command is extracted from the full text afterwards
+        response = self._stream_ai_response(prompt, "AI Analysis & Fix", "blue",
+                                             category=f"passthrough:{self.current_shell}",
+                                             semantic_text=f"{command}\n\n{error}")
         
         # Try to extract a corrected command
-        corrected = self.text_extractor.extract_clean_command(response)
+        corrected = self._extract_command(response)
         if corrected and corrected != command:
             # Use execute_command_with_options which handles its own confirmation flow
             result = self.command_executor.execute_command_with_options(
-                corrected, f"Fix for: {command}", self.current_shell, self._chat_with_ai
+                corrected, f"Fix for: {command}", self.current_shell, self._explain_with_ai
             )
     
     def show_plugins(self, category: str = None):
@@ -581,20 +954,10 @@ Format your response with clear sections and code blocks for any commands."""
         table.add_column("Description", style="green")
         table.add_column("Optimal Model", style="yellow")
         
+        # One metadata pass for the whole table; model choices come from the per-task memo
+        snapshot = self.plugin_manager.snapshot()
         for name in plugin_list:
-            info = self.plugin_manager.get_plugin_info(name)
-            plugin_data = self.plugin_manager.get_plugin(name)
-            optimal_model = self._get_optimal_model_for_plugin(name, plugin_data)
-            
-            # Truncate model name if too long
-            model_display = optimal_model[:15] + "..." if len(optimal_model) > 18 else optimal_model
-            
-            table.add_row(
-                name, 
-                info.get('category', 'general'), 
-                info.get('description', 'N/A'),
-                model_display
-            )
+            table.add_row(name, *self._get_plugin_row(name, snapshot[name]))
         
         console.print(table)
         
@@ -606,6 +969,18 @@ Format your response with clear sections and code blocks for any commands."""
             console.print(f"\n[dim]Categories: {categories_text}[/dim]")
             console.print("[dim]Use 'list <category>' to filter by category[/dim]")
     
+    def _get_plugin_row(self, name: str, meta: PluginMeta) -> Tuple[str, str, str]:
+        """Get the (category, description, model) cells for a plugin, formatted once"""
+        self._sync_model_caches()
+        row = self._plugin_rows.get(name)
+        if row is None:
+            optimal_model = self._get_optimal_model_for_plugin(name, meta)
+            
+            # Truncate model name if too long
+            model_display = optimal_model[:15] + "..." if len(optimal_model) > 18 else optimal_model
+            row = self._plugin_rows[name] = (meta.category, meta.description, model_display)
+        return row
+    
     def show_models(self):
         """Display available models with detailed information"""
         table = self.model_manager.list_models()
@@ -644,11 +1019,57 @@ Format your response with clear sections and code blocks for any commands."""
                 border_style="green"
             ))
     
-    def show_status(self):
-        """Show system status with AI analysis"""
-        cpu = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+    def _get_metrics(self) -> Tuple[float, float, float]:
+        """Get (cpu, memory, disk) usage percentages from a snapshot at most METRICS_TTL old"""
+        now = time.monotonic()
+        if self._metrics is not None and now - self._metrics_time < METRICS_TTL:
+            return self._metrics
+        
+        import psutil
+        
+        if self._disk_usage is None or now - self._disk_usage_time > DISK_USAGE_TTL:
+            self._disk_usage, self._disk_usage_time = psutil.disk_usage('/'), now
+        
+        # Average CPU usage since the previous sample instead of blocking for a fresh one
+        self._metrics = (psutil.cpu_percent(interval=None), psutil.virtual_memory().percent,
+                         self._disk_usage.percent)
+        self._metrics_time = now
+        return self._metrics
+    
+    def refresh_plugins(self):
+        """Re-discover the plugins directory and reload plugins from disk"""
+        _has_plugin_files.cache_clear()
+        AIFabricShell._plugins_dir_cache = None
+        
+        plugins_dir = self._find_plugins_directory()
+        if plugins_dir == self.plugin_manager.plugins_dir:
+            self.plugin_manager.reload_plugins()
+        else:
+            self.plugin_manager = PluginManager(str(plugins_dir))
+        
+        # Plugin metadata may have changed, so derived rows and model choices must be rebuilt
+        self._optimal_models.clear()
+        self._plugin_rows.clear()
+    
+    def refresh_system_info(self):
+        """Re-probe system information, e.g. after installing a tool mid-session"""
+        self.system_info.refresh()
+        self._snapshot_system_info()
+        console.print(f"[green]✓ System information refreshed ({len(self._available_tools)} tools available)[/green]")
+    
+    @staticmethod
+    def _status_icon(metric: str, value: float) -> str:
+        """Pick the status icon for a usage percentage from the metric's thresholds"""
+        warning, critical = _THRESHOLDS[metric]
+        return _STATUS_ICONS[(value >= warning) + (value >= critical)]
+    
+    def show_status(self, deep: bool = False):
+        """Show system status with AI analysis (performance, security and health when deep)"""
+        cpu, memory, disk = self._get_metrics()
+        
+        tools = ', '.join(self._available_tools)
+        values = dict(os_name=self.system_info.os_name, shell=self.current_shell,
+                      tools=tools, cpu=cpu, memory=memory, disk=disk)
         
         from rich.table import Table
         table = Table(title="System Status")
@@ -656,87 +1077,100 @@ Format your response with clear sections and code blocks for any commands."""
         table.add_column("Value", style="magenta") 
         table.add_column("Status", justify="center")
         
-        table.add_row("CPU", f"{cpu:.1f}%", "🟢" if cpu < 80 else "🔴")
-        table.add_row("Memory", f"{memory.percent:.1f}%", "🟢" if memory.percent < 80 else "🔴")
-        table.add_row("Disk", f"{disk.percent:.1f}%", "🟢" if disk.percent < 90 else "🔴")
+        table.add_row("CPU", f"{cpu:.1f}%", self._status_icon('cpu', cpu))
+        table.add_row("Memory", f"{memory:.1f}%", self._status_icon('mem', memory))
+        table.add_row("Disk", f"{disk:.1f}%", self._status_icon('disk', disk))
         table.add_row("OS", f"{self.system_info.os_name}", "ℹ️")
         table.add_row("Shell", f"{self.current_shell.upper()}", "ℹ️")
         table.add_row("AI Model", f"{self.model_manager.current_model}", "🤖")
-        
-        # Use performance-optimized model for analysis
-        recommendations = self.model_manager.get_model_recommendations('performance')
-        analysis_model = recommendations[0][0] if recommendations else self.model_manager.current_model
-        
-        with console.status("[yellow]AI analyzing...", spinner="dots"):
-            analysis_prompt = f"""Analyze these system metrics and provide actionable recommendations:
-
-## Current System Status
-- **CPU Usage:** {cpu:.1f}%
-- **Memory Usage:** {memory.percent:.1f}%  
-- **Disk Usage:** {disk.percent:.1f}%
-- **Operating System:** {self.system_info.os_name}
-- **Current Shell:** {self.current_shell}
-
-## Available Tools
-{', '.join([tool for tool, available in self.system_info.available_tools.items() if available])}
-
-Please provide:
-
-### Performance Assessment
-Overall system health evaluation.
-
-### Optimization Recommendations
-2-3 specific, actionable recommendations for this {self.system_info.os_name} system.
-
-### Commands to Run
-Specific shell commands that would help optimize performance.
-
-Focus on practical, {self.system_info.os_name}-specific optimizations."""
-            
-            analysis = self._chat_with_ai(analysis_prompt, model=analysis_model)
-        
-        # Create a side-by-side layout with enhanced Markdown rendering
         console.print(table)
+        
+        # Metrics are shown right away; the analysis streams in below them
         self.renderer.render_section_divider("AI System Analysis")
-        self.renderer.render_ai_response(analysis, "System Analysis & Recommendations", "blue")
+        if deep:
+            self._show_status_aspects(values)
+        else:
+            # Use performance-optimized model for analysis
+            analysis_model = self.model_manager.get_best_model('performance', self.model_manager.current_model)
+            self._stream_ai_response(render_prompt('status', **values), "System Analysis & Recommendations",
+                                     "blue", model=analysis_model, category="status", cacheable=False)
         
         # Show available tools and models
-        available_tools = [tool for tool, available in self.system_info.available_tools.items() if available]
-        console.print(f"\n[dim]Available tools: {', '.join(available_tools)}[/dim]")
+        console.print(f"\n[dim]Available tools: {tools}[/dim]")
         console.print(f"[dim]Available models: {len(self.model_manager.available_models)} | Current: {self.model_manager.current_model}[/dim]")
     
+    def _show_status_aspects(self, values: Dict[str, Any]):
+        """Run every status analysis at once, each on its best model, and show them in order"""
+        current = self.model_manager.current_model
+        # Submitted together so Ollama can work on them in parallel (see OLLAMA_NUM_PARALLEL)
+        futures = [(title, self._executor.submit(
+            self._chat_with_ai, render_prompt(template_id, **values), "",
+            self.model_manager.get_best_model(task_type, current), "status", False
+        )) for template_id, task_type, title in _STATUS_ASPECTS]
+        
+        for title, future in futures:
+            with console.status(f"[yellow]{title} analysis...", spinner="dots"):
+                response = future.result()
+            self.renderer.render_ai_response(response, f"{title} Analysis & Recommendations", "blue")
+    
     def show_command_history(self):
         """Show command execution history"""
-        history = self.command_executor.history_manager.history
+        history = self.command_executor.history_manager
         
         if not history:
             console.print("[yellow]No command history found[/yellow]")
             return
         
-        from rich.table import Table
-        table = Table(title="Command History (Last 10)")
-        table.add_column("Date", style="cyan")
-        table.add_column("Task", style="green", max_width=30)
-        table.add_column("Command", style="yellow", max_width=40)
-        table.add_column("Shell", style="magenta")
-        table.add_column("Status", justify="center")
-        
-        # Show last 10 entries
-        for entry in history[-10:]:
-            timestamp = entry['timestamp'][:19].replace('T', ' ')  # Format datetime
-            task = entry['task_description'][:27] + "..." if len(entry['task_description']) > 30 else entry['task_description']
-            command = entry['command'][:37] + "..." if len(entry['command']) > 40 else entry['command']
-            shell = entry['shell_type']
-            status = "✅" if entry.get('success', False) else "❌"
+        state, table = self._history_table
+        if table is None or state != (id(history), history.last_id):
+            from rich.table import Table
+            table = Table(title="Command History (Last 10)")
+            table.add_column("Date", style="cyan")
+            table.add_column("Task", style="green", max_width=30)
+            table.add_column("Command", style="yellow", max_width=40)
+            table.add_column("Shell", style="magenta")
+            table.add_column("Status", justify="center")
             
-            table.add_row(timestamp, task, command, shell, status)
+            for row in self._get_history_rows(history):
+                table.add_row(*row)
+            self._history_table = ((id(history), history.last_id), table)
         
         console.print(table)
         console.print(f"\n[dim]Total commands in history: {len(history)}[/dim]")
     
+    def _get_history_rows(self, history: CommandHistoryManager) -> List[Tuple[str, str, str, str, str]]:
+        """Formatted rows for the last 10 history entries, formatting only entries added since the last call"""
+        source_id, seen_id = self._history_rows_source
+        if source_id != id(history) or seen_id > history.last_id:
+            seen_id = 0
+            self._history_rows = []
+        
+        # Only the last 10 entries are shown, so older new entries need no formatting
+        if history.last_id != seen_id:
+            new_entries = history.recent(10, after_id=seen_id)
+            self._history_rows = (self._history_rows + [self._history_row(entry) for entry in new_entries])[-10:]
+        # Pruning deletes the oldest entries; if shown rows went with them, format the window afresh
+        if len(self._history_rows) > len(history):
+            self._history_rows = [self._history_row(entry) for entry in history.recent(10)]
+        self._history_rows_source = (id(history), history.last_id)
+        return self._history_rows
+    
+    @staticmethod
+    def _history_row(entry: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        """Table row for one history entry"""
+        return (
+            entry['timestamp'][:19].replace('T', ' '),  # Format datetime
+            _truncate(entry['task_description'], 30),
+            _truncate(entry['command'], 40),
+            entry['shell_type'],
+            "✅" if entry.get('success', False) else "❌"
+        )
+    
     def _chat_mode(self):
         """Interactive chat mode with model selection and enhanced rendering"""
         current_chat_model = self.model_manager.current_model
+        # Earlier turns are resent so the model keeps the conversation (and Ollama reuses its prompt cache)
+        history: List[Dict[str, str]] = []
         
         console.print(f"[yellow]Chat mode with {current_chat_model} (type 'model <name>' to switch, 'back'/'exit'/'quit' to return)[/yellow]")
         
@@ -749,7 +1183,7 @@ Focus on practical, {self.system_info.os_name}-specific optimizations."""
                 
                 if user_input.startswith('model '):
                     model_name = user_input[6:].strip()
-                    if model_name in self.model_manager.available_models:
+                    if model_name in self.model_manager.available_set:
                         current_chat_model = model_name
                         console.print(f"[green]Switched to {model_name} for this chat session[/green]")
                     else:
@@ -760,11 +1194,14 @@ Focus on practical, {self.system_info.os_name}-specific optimizations."""
                 if not user_input.strip():
                     continue
                 
-                with console.status("[yellow]AI thinking...", spinner="dots"):
-                    response = self._chat_with_ai(user_input, model=current_chat_model)
-                
-                # Use enhanced Markdown rendering for chat responses
-                self.renderer.render_ai_response(response, f"AI Response ({current_chat_model})", "green")
+                # Stream chat responses with enhanced Markdown rendering
+                response = self._stream_ai_response(user_input, f"AI Response ({current_chat_model})", "green",
+                                                    model=current_chat_model, category="chat", history=history,
+                                                    semantic_text=user_input)
+                if "AI communication error" not in response:
+                    history += ({'role': 'user', 'content': user_input},
+                                {'role': 'assistant', 'content': response})
+                    del history[:-CHAT_HISTORY_MESSAGES]
                 
             except KeyboardInterrupt:
                 break
@@ -778,14 +1215,20 @@ Welcome to the AI Fabric Shell with **enhanced command handling**! All AI respon
 ## Core Commands
 
 - **`cmd <task>`** - Generate one-liner commands with y/n/e options
+- **`cmd --parallel <task>`** - Same, but troubleshoot failures with several models at once
 - **`run <plugin>`** - Execute specific plugin  
 - **`list [category]`** - Show plugins (optionally by category)
 - **`models`** - Show available AI models with capabilities
 - **`switch [model]`** - Switch AI model (interactive if no model specified)
 - **`status`** - System status with AI analysis
+- **`status --deep`** - Add security and health analyses, generated in parallel
 - **`chat`** - AI chat mode with Markdown rendering
 - **`troubleshoot <issue>`** - Quick troubleshooting with formatted output
 - **`history`** - Show command execution history
+- **`set cache|nocache`** - Turn reuse of cached AI responses on or off
+- **`<command>!`** - Run once without cached responses, e.g. `cmd! <task>`
+- **`refresh`** - Re-detect system information and available tools
+- **`reload`** - Re-discover the plugins directory and reload plugins
 - **`help`** - Show this help
 - **`quit`** - Exit
 
@@ -817,9 +1260,9 @@ When commands are generated, you now have three options:
 - **Model:** {self.model_manager.current_model}
 - **Shell:** {self.current_shell.upper()}  
 - **Platform:** {self.platform.title()}
-- **Plugins:** {len(self.plugin_manager.list_plugins())} available
+- **Plugins:** {len(self.plugin_manager.plugins)} available
 - **Available Models:** {len(self.model_manager.available_models)}
-- **Command History:** {len(self.command_executor.history_manager.history)} entries
+- **Command History:** {len(self.command_executor.history_manager)} entries
 
 ## Examples
 
@@ -859,13 +1302,20 @@ history
     def _get_categories_summary_markdown(self) -> str:
         """Get a markdown-formatted summary of plugin categories"""
         categories = self.plugin_manager.get_plugins_by_category()
+        # The grouping is a new object whenever plugins change, so it doubles as the cache key
+        cached_for, summary = self._categories_summary
+        if cached_for is categories:
+            return summary
+        
         summary_lines = []
         for category, plugins in categories.items():
             plugin_list = ', '.join(plugins[:3])
             if len(plugins) > 3:
                 plugin_list += f" *(+{len(plugins)-3} more)*"
             summary_lines.append(f"- **{category.title()}** ({len(plugins)}): {plugin_list}")
-        return '\n'.join(summary_lines) if summary_lines else "- No plugin categories found"
+        summary = '\n'.join(summary_lines) if summary_lines else "- No plugin categories found"
+        self._categories_summary = (categories, summary)
+        return summary
     
     def run(self):
         """Main interactive shell with enhanced welcome message"""
@@ -875,9 +1325,9 @@ history
 - **Model:** {self.model_manager.current_model}
 - **Shell:** {self.current_shell.upper()}
 - **Platform:** {self.platform.title()}
-- **Plugins:** {len(self.plugin_manager.list_plugins())} available
+- **Plugins:** {len(self.plugin_manager.plugins)} available
 - **Models:** {len(self.model_manager.available_models)} available
-- **Command History:** {len(self.command_executor.history_manager.history)} entries
+- **Command History:** {len(self.command_executor.history_manager)} entries
 
 ## ✨ New Enhanced Features
 
@@ -897,56 +1347,47 @@ Type **`help`** for all commands, **`history`** to see past commands, or **`mode
         # Use enhanced rendering for welcome message
         self.renderer.render_ai_response(welcome_content, "Welcome", "cyan")
         
+        try:
+            self._repl()
+        finally:
+            self.close()
+    
+    def close(self):
+        """Release the Ollama connection pool, background workers and the PowerShell process"""
+        try:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        finally:
+            try:
+                self.model_manager.close()
+            finally:
+                self.command_executor.close()
+    
+    def _repl(self):
+        """Read and dispatch commands until the user quits"""
         while True:
             try:
                 # Enhanced prompt showing current model
                 model_short = self.model_manager.current_model.split(':')[0]  # Remove version tags
-                cmd = Prompt.ask(f"fabric({model_short})>")
+                cmd = Prompt.ask(f"fabric({model_short})>").strip()
                 
                 if not cmd:
                     continue
                 
-                # Parse commands
-                cmd_parts = cmd.split()
-                cmd_main = cmd_parts[0].lower()
-                cmd_args = cmd_parts[1:] if len(cmd_parts) > 1 else []
+                # Split off the command word without building a token list
+                cmd_main, _, cmd_args = cmd.partition(' ')
+                cmd_main = cmd_main.lower()
+                handler = self._commands.get(cmd_main)
+                
+                # A trailing '!' (e.g. `cmd! <task>`) runs the command without cached responses
+                if handler is None and cmd_main.endswith('!'):
+                    handler = self._commands.get(cmd_main[:-1])
+                    if handler:
+                        handler = self._without_cache(handler)
                 
                 # Check for built-in commands first
-                if cmd_main in ['quit', 'exit', 'q']:
-                    console.print("[yellow]Goodbye![/yellow]")
-                    break
-                elif cmd_main in ['help', 'h']:
-                    self.show_help()
-                elif cmd_main in ['list', 'ls']:
-                    category = cmd_args[0] if cmd_args else None
-                    self.show_plugins(category)
-                elif cmd_main == 'models':
-                    self.show_models()
-                elif cmd_main == 'switch':
-                    model_name = cmd_args[0] if cmd_args else None
-                    self.switch_model(model_name)
-                elif cmd_main == 'status':
-                    self.show_status()
-                elif cmd_main in ['history', 'hist']:
-                    self.show_command_history()
-                elif cmd_main == 'chat':
-                    self._chat_mode()
-                elif cmd_main == 'run':
-                    if cmd_args:
-                        plugin_name = cmd_args[0]
-                        self.run_plugin(plugin_name)
-                    else:
-                        console.print("[yellow]Usage: run <plugin_name>[/yellow]")
-                        console.print("Available plugins:")
-                        self.show_plugins()
-                elif cmd_main == 'cmd':
-                    task = ' '.join(cmd_args) if cmd_args else Prompt.ask("Describe task")
-                    self.generate_oneliner(task)
-                elif cmd_main in ['troubleshoot', 'fix']:
-                    issue = ' '.join(cmd_args) if cmd_args else Prompt.ask("Describe issue")
-                    self.quick_troubleshoot(issue)
-                elif cmd_main == 'debug':
-                    self._debug_plugins()
+                if handler:
+                    if handler(cmd_args.strip()):
+                        break
                 else:
                     # Unknown command - try passing through to shell
                     console.print(f"[yellow]Unknown fabric command. Trying as {self.current_shell} command...[/yellow]")
@@ -957,51 +1398,128 @@ Type **`help`** for all commands, **`history`** to see past commands, or **`mode
             except Exception as e:
                 console.print(f"[red]Error: {e}[/red]")
     
+    def _without_cache(self, handler):
+        """Wrap a command handler so it always regenerates AI responses"""
+        def run_uncached(args: str):
+            previous, self._cache_enabled = self._cache_enabled, False
+            try:
+                return handler(args)
+            finally:
+                self._cache_enabled = previous
+        return run_uncached
+    
+    def _cmd_quit(self, args: str) -> bool:
+        """Leave the shell; returning True stops the main loop"""
+        console.print("[yellow]Goodbye![/yellow]")
+        return True
+    
+    def _cmd_help(self, args: str):
+        self.show_help()
+    
+    def _cmd_list(self, args: str):
+        category = args.partition(' ')[0] or None
+        self.show_plugins(category)
+    
+    def _cmd_models(self, args: str):
+        self.show_models()
+    
+    def _cmd_switch(self, args: str):
+        model_name = args.partition(' ')[0] or None
+        self.switch_model(model_name)
+    
+    def _cmd_status(self, args: str):
+        self.show_status(deep=args == '--deep')
+    
+    def _cmd_history(self, args: str):
+        self.show_command_history()
+    
+    def _cmd_chat(self, args: str):
+        self._chat_mode()
+    
+    def _cmd_run(self, args: str):
+        plugin_name = args.partition(' ')[0]
+        if plugin_name:
+            self.run_plugin(plugin_name)
+        else:
+            console.print("[yellow]Usage: run <plugin_name>[/yellow]")
+            console.print("Available plugins:")
+            self.show_plugins()
+    
+    def _cmd_oneliner(self, args: str):
+        flag, _, rest = args.partition(' ')
+        parallel = flag == '--parallel'
+        if parallel:
+            args = rest.strip()
+        task = args or Prompt.ask("Describe task")
+        self.generate_oneliner(task, parallel=parallel)
+    
+    def _cmd_troubleshoot(self, args: str):
+        issue = args or Prompt.ask("Describe issue")
+        self.quick_troubleshoot(issue)
+    
+    def _cmd_debug(self, args: str):
+        self._debug_plugins()
+    
+    def _cmd_refresh(self, args: str):
+        self.refresh_system_info()
+    
+    def _cmd_reload(self, args: str):
+        self.refresh_plugins()
+    
+    def _cmd_set(self, args: str):
+        option = args.partition(' ')[0].lower()
+        if option in ('cache', 'nocache'):
+            self._cache_enabled = option == 'cache'
+            state = "enabled" if self._cache_enabled else "disabled"
+            console.print(f"[green]✓ Response caching {state}[/green]")
+        else:
+            console.print("[yellow]Usage: set cache | set nocache[/yellow]")
+    
     def _debug_plugins(self):
         """Debug plugin loading and display issues"""
+        from rich.console import Group
         debug_info = self.plugin_manager.debug_info()
         
-        console.print("[cyan]Plugin Debug Information[/cyan]")
-        console.print(f"Plugins directory: {debug_info['plugins_dir']}")
-        console.print(f"Directory exists: {debug_info['plugins_dir_exists']}")
-        console.print(f"YAML files found: {debug_info['yaml_files']}")
-        console.print(f"Loaded plugins: {debug_info['loaded_plugins']}")
-        console.print(f"Plugin count: {debug_info['plugin_count']}")
-        
-        console.print("\n[yellow]Plugin data structure:[/yellow]")
-        for name, keys in debug_info['plugins_data'].items():
-            console.print(f"  {name}: {keys}")
+        # Collected and printed at once instead of one console.print per line
+        lines = [
+            "[cyan]Plugin Debug Information[/cyan]",
+            f"Plugins directory: {debug_info['plugins_dir']}",
+            f"Directory exists: {debug_info['plugins_dir_exists']}",
+            f"YAML files found: {debug_info['yaml_files']}",
+            f"Loaded plugins: {debug_info['loaded_plugins']}",
+            f"Plugin count: {debug_info['plugin_count']}",
+            "\n[yellow]Plugin data structure:[/yellow]",
+        ]
+        lines.extend(f"  {name}: {keys}" for name, keys in debug_info['plugins_data'].items())
         
         # Test the list method
         plugin_list = self.plugin_manager.list_plugins()
-        console.print(f"\nlist_plugins() returns: {plugin_list}")
+        lines.append(f"\nlist_plugins() returns: {plugin_list}")
         
         # Test each plugin's info
-        console.print("\n[yellow]Plugin info test:[/yellow]")
-        for name in plugin_list:
-            info = self.plugin_manager.get_plugin_info(name)
-            console.print(f"  {name}: {info}")
+        lines.append("\n[yellow]Plugin info test:[/yellow]")
+        infos = {name: self.plugin_manager.get_plugin_info(name) for name in plugin_list}
+        lines.extend(f"  {name}: {info}" for name, info in infos.items())
         
         # Test categories
-        categories = self.plugin_manager.get_plugins_by_category()
-        console.print(f"\nCategories: {categories}")
+        lines.append(f"\nCategories: {dict(self.plugin_manager.get_plugins_by_category())}")
         
         # Try to manually create a table
         if plugin_list:
-            console.print("\n[green]Manually creating table...[/green]")
+            lines.append("\n[green]Manually creating table...[/green]")
             from rich.table import Table
             table = Table(title="Debug Table")
             table.add_column("Name", style="cyan")
             table.add_column("Category", style="magenta")
             table.add_column("Description", style="green")
             
-            for name in plugin_list:
-                info = self.plugin_manager.get_plugin_info(name)
+            for name, info in infos.items():
                 table.add_row(
                     name,
                     info.get('category', 'N/A'),
                     info.get('description', 'N/A')
                 )
-            console.print(table)
+            console.print(Group("\n".join(lines), table))
         else:
-            console.print("[red]No plugins to display in table[/red]")
\ No newline at end of file
+            lines.append("[red]No plugins to display in table[/red]")
+            console.print("\n".join(lines))
\ No newline at end of file
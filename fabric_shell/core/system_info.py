@@ -2,9 +2,23 @@
 System information detection and context generation
 """
 
+import json
+import os
 import platform
 import shutil
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+TOOLS_CACHE_FILE = Path.home() / ".fabric_shell" / "tools.json"
+PROBED_TOOLS = ('git', 'docker', 'python', 'node', 'npm', 'curl', 'wget', 'ssh')
+WINDOWS_PROBED_TOOLS = ('powershell', 'wsl')
+
+@lru_cache(maxsize=None)
+def probe_executor() -> ThreadPoolExecutor:
+    """Shared pool for filesystem probes, created on first use"""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="fabric-probe")
 
 class SystemInfo:
     """Detect and provide system information for AI context"""
@@ -26,40 +40,77 @@ class SystemInfo:
         self.os_version = platform.version()
         self.architecture = platform.machine()
         self.python_version = platform.python_version()
-        self.available_tools = self._detect_tools()
+        self.available_tools = self._load_cached_tools()
+        self._context_string: Optional[str] = None
+        self._compact_context_string: Optional[str] = None
+        
+    def refresh(self):
+        """Re-probe the available tools and rebuild the context strings on next use"""
+        self.available_tools = self._load_cached_tools(force=True)
+        self._context_string = None
+        self._compact_context_string = None
+    
+    def _path_signature(self) -> List[List]:
+        """PATH directories with their modification times; changes when tools are installed or removed"""
+        signature: List[List] = [[self.os_name, os.environ.get('PATHEXT', '')]]
+        for directory in os.environ.get('PATH', '').split(os.pathsep):
+            try:
+                signature.append([directory, os.stat(directory).st_mtime_ns])
+            except OSError:
+                continue
+        return signature
+    
+    def _load_cached_tools(self, force: bool = False) -> Dict[str, bool]:
+        """Return the tools recorded in the cache file if PATH is unchanged, otherwise detect and record them"""
+        signature = self._path_signature()
+        if not force:
+            try:
+                with open(TOOLS_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached['signature'] == signature:
+                    return cached['tools']
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # Missing or unreadable cache; fall back to probing
         
+        tools = self._detect_tools()
+        try:
+            TOOLS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(TOOLS_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'signature': signature, 'tools': tools}, f)
+        except OSError:
+            pass  # The cache is only an optimization
+        return tools
+    
     def _detect_tools(self) -> Dict[str, bool]:
         """Detect available command-line tools"""
-        tools = {
-            'git': shutil.which('git') is not None,
-            'docker': shutil.which('docker') is not None,
-            'python': shutil.which('python') is not None,
-            'node': shutil.which('node') is not None,
-            'npm': shutil.which('npm') is not None,
-            'curl': shutil.which('curl') is not None,
-            'wget': shutil.which('wget') is not None,
-            'ssh': shutil.which('ssh') is not None,
-        }
+        names = PROBED_TOOLS + WINDOWS_PROBED_TOOLS if self.os_name == 'Windows' else PROBED_TOOLS
+        
+        # Each lookup stats every PATH directory, so run them concurrently
+        tools = {name: path is not None
+                 for name, path in zip(names, probe_executor().map(shutil.which, names))}
         
         # Windows specific
         if self.os_name == 'Windows':
-            tools.update({
-                'powershell': shutil.which('powershell') is not None,
-                'cmd': True,  # cmd is always available on Windows
-                'wsl': shutil.which('wsl') is not None,
-            })
+            tools['cmd'] = True  # cmd is always available on Windows
         
         return tools
     
+    def _available_tool_names(self) -> str:
+        """Comma-separated names of the available tools"""
+        # Sorted so the context is byte-identical across calls (prompt prefix caching)
+        return ', '.join(sorted(tool for tool, available in self.available_tools.items() if available))
+    
     def get_context_string(self) -> str:
         """Generate context string for AI interactions"""
-        available_tools = [tool for tool, available in self.available_tools.items() if available]
+        # The detected values do not change during a session, so build the string once
+        if self._context_string is not None:
+            return self._context_string
         
         context = f"""System Context:
 - OS: {self.os_name} {self.os_version}
 - Architecture: {self.architecture}
 - Python: {self.python_version}
-- Available tools: {', '.join(available_tools)}"""
+- Available tools: {self._available_tool_names()}"""
         
         if self.os_name == 'Windows':
             context += f"\n- Running in Windows environment with PowerShell/CMD support"
@@ -67,5 +118,14 @@ class SystemInfo:
             context += f"\n- Running on macOS with standard Unix utilities"
         else:
             context += f"\n- Running on Linux/Unix with standard shell utilities"
-            
-        return context
\ No newline at end of file
+        
+        self._context_string = context
+        return context
+    
+    def get_compact_context_string(self) -> str:
+        """Generate a short context string (OS and tools only) for quick command generation"""
+        if self._compact_context_string is None:
+            self._compact_context_string = f"""System Context:
+- OS: {self.os_name}
+- Available tools: {self._available_tool_names()}"""
+        return self._compact_context_string
\ No newline at end of file
@@ -3,31 +3,206 @@ AI Model management with capability analysis and recommendations
 """
 
 import re
-import ollama
-from typing import List, Dict, Any, Tuple
-from rich.console import Console
+import threading
+from typing import FrozenSet, List, Dict, Any, Optional, Tuple
 from rich.table import Table
+from ..utils.console import console
 
-console = Console()
+# How long Ollama keeps a model loaded (with its prompt KV cache) between requests
+OLLAMA_KEEP_ALIVE = "30m"
+
+# Request options sent with every call; a different context size would make Ollama reload the model
+OLLAMA_OPTIONS = {'num_ctx': 4096}
+
+# Splits a model tag into its base name and version parts, e.g. 'llama3.1:8b' -> 'llama3'
+_MODEL_SPLIT_RE = re.compile(r'[:.-]')
+
+# Capability profiles of known model families
+_MODEL_PROFILES = {
+    # Code-focused models
+    'codellama': {
+        'category': 'code',
+        'description': 'Specialized for code generation and analysis',
+        'strengths': ['Programming', 'Code review', 'Debugging', 'Script generation'],
+        'best_for': ['code_review', 'script_generator', 'docker_helper'],
+        'size': 'Large',
+        'speed': 'Medium'
+    },
+    'codegemma': {
+        'category': 'code',
+        'description': 'Google\'s code-focused model',
+        'strengths': ['Code completion', 'Refactoring', 'Documentation'],
+        'best_for': ['code_review', 'script_generator'],
+        'size': 'Medium',
+        'speed': 'Fast'
+    },
+
+    # General purpose models
+    'llama3.1': {
+        'category': 'general',
+        'description': 'Balanced model for general tasks',
+        'strengths': ['General knowledge', 'Problem solving', 'Command generation'],
+        'best_for': ['cmd_generator', 'troubleshooter', 'quick_command'],
+        'size': 'Large',
+        'speed': 'Medium'
+    },
+    'llama3.2': {
+        'category': 'general',
+        'description': 'Latest Llama model with improved capabilities',
+        'strengths': ['Reasoning', 'Analysis', 'System administration'],
+        'best_for': ['troubleshooter', 'security_audit', 'performance_optimizer'],
+        'size': 'Large',
+        'speed': 'Medium'
+    },
+    'mistral': {
+        'category': 'general',
+        'description': 'Fast and efficient general-purpose model',
+        'strengths': ['Quick responses', 'System commands', 'Basic troubleshooting'],
+        'best_for': ['cmd_generator', 'quick_command', 'file_operations'],
+        'size': 'Medium',
+        'speed': 'Fast'
+    },
+    'mixtral': {
+        'category': 'analysis',
+        'description': 'Mixture of experts model for complex reasoning',
+        'strengths': ['Complex analysis', 'Multi-step reasoning', 'Performance optimization'],
+        'best_for': ['performance_optimizer', 'security_audit', 'log_analyzer'],
+        'size': 'Large',
+        'speed': 'Slow'
+    },
+
+    # Specialized models
+    'phi3': {
+        'category': 'lightweight',
+        'description': 'Small, efficient model for quick tasks',
+        'strengths': ['Speed', 'Low resource usage', 'Simple commands'],
+        'best_for': ['quick_command', 'file_operations'],
+        'size': 'Small',
+        'speed': 'Very Fast'
+    },
+    'gemma': {
+        'category': 'general',
+        'description': 'Google\'s efficient general model',
+        'strengths': ['Balanced performance', 'Good reasoning'],
+        'best_for': ['troubleshooter', 'deployment_planner'],
+        'size': 'Medium',
+        'speed': 'Fast'
+    }
+}
 
 class ModelManager:
     """Manages AI model selection and switching"""
     
+    # Preferred model families per task type, best first
+    TASK_CATEGORIES = {
+        'code': ['codellama', 'codegemma'],
+        'analysis': ['mixtral', 'llama3.2', 'llama3.1'],
+        'quick': ['phi3', 'mistral', 'gemma'],
+        'general': ['llama3.1', 'llama3.2', 'mistral'],
+        'security': ['mixtral', 'llama3.2'],
+        'performance': ['mixtral', 'llama3.2']
+    }
+    
     def __init__(self):
         self.current_model = "llama3.1"  # Default model
-        self.available_models = []
-        self.model_info = {}
-        self._detect_models()
+        self._client = None
+        self._available_models: List[str] = []
+        # Constant-time membership checks by full tag or by name stem (before ':')
+        self._available_set: FrozenSet[str] = frozenset()
+        self._name_prefix_index: Dict[str, List[str]] = {}
+        self._model_info: Dict[str, Dict[str, Any]] = {}
+        # Bumped whenever the model list or current model changes, so callers can drop derived caches
+        self.generation = 0
+        self._recommendation_cache: Dict[str, List[Tuple[str, str]]] = {}
+        # Models table with the (generation, current model) it was built for
+        self._models_table: Tuple[Optional[Tuple[int, str]], Optional[Table]] = (None, None)
+        self._best_model_cache: Dict[str, Optional[str]] = {}
+        
+        # Connecting and listing models runs in the background so the rest of startup
+        # can proceed; the attributes below wait for it on first access
+        self._models_ready = threading.Event()
+        threading.Thread(target=self._start, name="fabric-models", daemon=True).start()
+    
+    def _start(self):
+        """Create the Ollama client and detect models (runs on the background thread)"""
+        try:
+            # Imported here so that importing the package does not pay for ollama/httpx
+            import httpx
+            import ollama
+            
+            # One client keeps its HTTP connections to Ollama alive across requests.
+            # Only connecting is time-limited; local generation can legitimately take minutes.
+            self._client = ollama.Client(
+                timeout=httpx.Timeout(None, connect=10.0),
+                limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=90)
+            )
+            self._detect_models()
+        except Exception as e:
+            console.print(f"[red]Error connecting to Ollama: {e}[/red]")
+        finally:
+            self._models_ready.set()
+    
+    @property
+    def client(self):
+        self._models_ready.wait()
+        return self._client
+    
+    @property
+    def available_models(self) -> List[str]:
+        self._models_ready.wait()
+        return self._available_models
+    
+    @property
+    def available_set(self) -> FrozenSet[str]:
+        self._models_ready.wait()
+        return self._available_set
+    
+    @property
+    def name_prefix_index(self) -> Dict[str, List[str]]:
+        self._models_ready.wait()
+        return self._name_prefix_index
+    
+    @property
+    def model_info(self) -> Dict[str, Dict[str, Any]]:
+        self._models_ready.wait()
+        return self._model_info
+    
+    def close(self):
+        """Close the pooled connections to Ollama"""
+        client = self.client
+        if client is None:
+            return
+        # Client.close() only exists in newer ollama releases; older ones keep the
+        # httpx client on a private attribute.
+        close = getattr(client, 'close', None) or getattr(getattr(client, '_client', None), 'close', None)
+        if close is not None:
+            close()
     
     def _detect_models(self):
         """Detect available Ollama models and their capabilities"""
         try:
-            models_response = ollama.list()
-            self.available_models = self._extract_models(models_response)
+            models_response = self._client.list()
+            self._available_models = self._extract_models(models_response)
+            self._index_models()
+            self._recommendation_cache.clear()
+            self._best_model_cache.clear()
             self._analyze_model_capabilities()
+            self.generation += 1
         except Exception as e:
             console.print(f"[red]Error detecting models: {e}[/red]")
     
+    def _index_models(self):
+        """Rebuild the lookup structures for the available models"""
+        self._available_set = frozenset(self._available_models)
+        prefix_index: Dict[str, List[str]] = {}
+        for model in self._available_models:
+            prefix_index.setdefault(model.split(':')[0], []).append(model)
+        self._name_prefix_index = prefix_index
+    
+    def has_model(self, name: str) -> bool:
+        """Check whether a model is installed, by full tag or by name without a tag"""
+        return name in self.available_set or name in self.name_prefix_index
+    
     def _extract_models(self, models_response) -> List[str]:
         """Extract model names from various response formats"""
         if isinstance(models_response, dict):
@@ -51,89 +226,19 @@ class ModelManager:
     
     def _analyze_model_capabilities(self):
         """Analyze and categorize model capabilities"""
-        model_profiles = {
-            # Code-focused models
-            'codellama': {
-                'category': 'code',
-                'description': 'Specialized for code generation and analysis',
-                'strengths': ['Programming', 'Code review', 'Debugging', 'Script generation'],
-                'best_for': ['code_review', 'script_generator', 'docker_helper'],
-                'size': 'Large',
-                'speed': 'Medium'
-            },
-            'codegemma': {
-                'category': 'code',
-                'description': 'Google\'s code-focused model',
-                'strengths': ['Code completion', 'Refactoring', 'Documentation'],
-                'best_for': ['code_review', 'script_generator'],
-                'size': 'Medium',
-                'speed': 'Fast'
-            },
-            
-            # General purpose models
-            'llama3.1': {
-                'category': 'general',
-                'description': 'Balanced model for general tasks',
-                'strengths': ['General knowledge', 'Problem solving', 'Command generation'],
-                'best_for': ['cmd_generator', 'troubleshooter', 'quick_command'],
-                'size': 'Large',
-                'speed': 'Medium'
-            },
-            'llama3.2': {
-                'category': 'general',
-                'description': 'Latest Llama model with improved capabilities',
-                'strengths': ['Reasoning', 'Analysis', 'System administration'],
-                'best_for': ['troubleshooter', 'security_audit', 'performance_optimizer'],
-                'size': 'Large',
-                'speed': 'Medium'
-            },
-            'mistral': {
-                'category': 'general',
-                'description': 'Fast and efficient general-purpose model',
-                'strengths': ['Quick responses', 'System commands', 'Basic troubleshooting'],
-                'best_for': ['cmd_generator', 'quick_command', 'file_operations'],
-                'size': 'Medium',
-                'speed': 'Fast'
-            },
-            'mixtral': {
-                'category': 'analysis',
-                'description': 'Mixture of experts model for complex reasoning',
-                'strengths': ['Complex analysis', 'Multi-step reasoning', 'Performance optimization'],
-                'best_for': ['performance_optimizer', 'security_audit', 'log_analyzer'],
-                'size': 'Large',
-                'speed': 'Slow'
-            },
-            
-            # Specialized models
-            'phi3': {
-                'category': 'lightweight',
-                'description': 'Small, efficient model for quick tasks',
-                'strengths': ['Speed', 'Low resource usage', 'Simple commands'],
-                'best_for': ['quick_command', 'file_operations'],
-                'size': 'Small',
-                'speed': 'Very Fast'
-            },
-            'gemma': {
-                'category': 'general',
-                'description': 'Google\'s efficient general model',
-                'strengths': ['Balanced performance', 'Good reasoning'],
-                'best_for': ['troubleshooter', 'deployment_planner'],
-                'size': 'Medium',
-                'speed': 'Fast'
-            }
-        }
-        
         # Populate model info for available models
-        for model in self.available_models:
+        for model in self._available_models:
+            model_lower = model.lower()
             # Extract base model name (remove version suffixes)
-            base_name = re.split(r'[:.-]', model.lower())[0]
+            base_name = _MODEL_SPLIT_RE.split(model_lower, 1)[0]
             
-            # Find matching profile
-            profile = None
-            for profile_name, profile_data in model_profiles.items():
-                if profile_name in model.lower() or base_name == profile_name:
-                    profile = profile_data.copy()
-                    break
+            # Find matching profile: by base name directly, otherwise by substring
+            profile = _MODEL_PROFILES.get(base_name)
+            if profile is None:
+                profile = next((profile_data for profile_name, profile_data in _MODEL_PROFILES.items()
+                                if profile_name in model_lower), None)
+            if profile is not None:
+                profile = profile.copy()
             
             # Default profile for unknown models
             if not profile:
@@ -146,7 +251,7 @@ class ModelManager:
                     'speed': 'Unknown'
                 }
             
-            self.model_info[model] = profile
+            self._model_info[model] = profile
     
     def get_best_model_for_plugin(self, plugin_name: str) -> str:
         """Get the best available model for a specific plugin"""
@@ -160,22 +265,40 @@ class ModelManager:
     
     def switch_model(self, model_name: str) -> bool:
         """Switch to a different model"""
-        if model_name not in self.available_models:
+        if model_name not in self.available_set:
             console.print(f"[red]Model '{model_name}' not available[/red]")
             return False
         
-        # Test the model before switching
+        # Confirm the server can resolve the model; this reads metadata without running inference
         try:
-            ollama.chat(model=model_name, messages=[{'role': 'user', 'content': 'test'}])
+            self.client.show(model_name)
             self.current_model = model_name
+            self.generation += 1
             console.print(f"[green]✓ Switched to model: {model_name}[/green]")
-            return True
         except Exception as e:
             console.print(f"[red]Failed to switch to {model_name}: {e}[/red]")
             return False
+        
+        # Load the weights in the background so the first real request does not wait for them
+        threading.Thread(target=self._warm_up, args=(model_name,), name="fabric-warmup", daemon=True).start()
+        return True
+    
+    def _warm_up(self, model_name: str):
+        """Ask Ollama to load a model; an empty prompt loads it without generating anything"""
+        try:
+            self.client.generate(model=model_name, prompt="", options=OLLAMA_OPTIONS,
+                                 keep_alive=OLLAMA_KEEP_ALIVE)
+        except Exception:
+            pass  # A failed warm-up only means the first request loads the model itself
     
     def list_models(self) -> Table:
         """Create a table of available models with their info"""
+        # Reuse the table until the model list or the current model changes
+        state = (self.generation, self.current_model)
+        built_for, table = self._models_table
+        if built_for == state:
+            return table
+        
         table = Table(title="Available AI Models")
         table.add_column("Model", style="cyan", no_wrap=True)
         table.add_column("Category", style="magenta")
@@ -197,22 +320,19 @@ class ModelManager:
                 current_marker
             )
         
+        self._models_table = (state, table)
         return table
     
     def get_model_recommendations(self, task_type: str) -> List[Tuple[str, str]]:
         """Get model recommendations for a task type"""
-        recommendations = []
+        # Recommendations only depend on the detected models, so compute each task type once
+        cached = self._recommendation_cache.get(task_type)
+        if cached is not None:
+            return list(cached)
         
-        task_categories = {
-            'code': ['codellama', 'codegemma'],
-            'analysis': ['mixtral', 'llama3.2', 'llama3.1'],
-            'quick': ['phi3', 'mistral', 'gemma'],
-            'general': ['llama3.1', 'llama3.2', 'mistral'],
-            'security': ['mixtral', 'llama3.2'],
-            'performance': ['mixtral', 'llama3.2']
-        }
+        recommendations = []
         
-        preferred_models = task_categories.get(task_type, task_categories['general'])
+        preferred_models = self.TASK_CATEGORIES.get(task_type, self.TASK_CATEGORIES['general'])
         
         for model_preference in preferred_models:
             for available_model in self.available_models:
@@ -222,4 +342,21 @@ class ModelManager:
                     recommendations.append((available_model, reason))
                     break
         
-        return recommendations[:3]  # Top 3 recommendations
\ No newline at end of file
+        recommendations = recommendations[:3]  # Top 3 recommendations
+        self._recommendation_cache[task_type] = recommendations
+        return list(recommendations)
+    
+    def get_best_model(self, task_type: str, default: Optional[str] = None) -> Optional[str]:
+        """Get the top recommended model for a task type, or default if none is available"""
+        if task_type not in self._best_model_cache:
+            # Only the first match is needed, so stop scanning as soon as one is found
+            preferred_models = self.TASK_CATEGORIES.get(task_type, self.TASK_CATEGORIES['general'])
+            self._best_model_cache[task_type] = next(
+                (available_model for model_preference in preferred_models
+                 for available_model in self.available_models
+                 if model_preference in available_model.lower()),
+                None
+            )
+        
+        best_model = self._best_model_cache[task_type]
+        return best_model if best_model is not None else default
@@ -2,6 +2,6 @@
 Plugin management components
 """
 
-from .manager import PluginManager
+from .manager import PluginManager, PluginMeta
 
-__all__ = ['PluginManager']
\ No newline at end of file
+__all__ = ['PluginManager', 'PluginMeta']
\ No newline at end of file
@@ -2,12 +2,49 @@
 Plugin management system for loading and executing YAML-based plugins
 """
 
-import yaml
+import os
+import sys
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from rich.console import Console
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from ..core.system_info import probe_executor
+from ..utils.console import console
 
-console = Console()
+@lru_cache(maxsize=None)
+def _yaml_loader():
+    """libyaml's C loader when PyYAML was built with it, otherwise the pure-Python one"""
+    # PyYAML is imported on first parse, so startup with no changed plugin files never loads it
+    import yaml
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+def _parse_plugin_file(plugin_file: str) -> Any:
+    """Read and parse one plugin file"""
+    import yaml
+    with open(plugin_file, 'rb') as f:
+        return yaml.load(f.read(), Loader=_yaml_loader())
+
+# dataclass(slots=True) needs Python 3.10+; older interpreters get a regular instance dict
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
+class PluginMeta:
+    """Frozen view of the plugin attributes read on every listing/run"""
+    name: str
+    description: str = 'No description'
+    category: str = 'general'
+    parameters: dict = field(default_factory=dict)
+    examples: list = field(default_factory=list)
+    preferred_model: Optional[str] = None
+    model_category: Optional[str] = None
+    batch_prompt: bool = False
+    
+    @classmethod
+    def from_plugin(cls, name: str, plugin_data: Dict[str, Any]) -> 'PluginMeta':
+        """Build metadata from raw plugin YAML, keeping defaults for missing keys"""
+        return cls(name=name, **{f.name: plugin_data[f.name] for f in fields(cls)
+                                 if f.name != 'name' and f.name in plugin_data})
 
 class PluginManager:
     """Manages loading and execution of AI automation plugins"""
@@ -21,58 +58,134 @@ class PluginManager:
         self.plugins_dir = Path(plugins_dir)
         self.plugins_dir.mkdir(exist_ok=True)
         self.plugins = {}
+        self.plugin_meta: Dict[str, PluginMeta] = {}
+        # Modification time of each loaded plugin file, so reloads only re-parse changed files
+        self._mtimes: Dict[str, int] = {}
+        # Derived views, built on first access and reset when plugins change
+        self._plugin_names: Optional[Tuple[str, ...]] = None
+        self._plugins_by_category: Optional[Mapping[str, Tuple[str, ...]]] = None
         self._load_plugins()
     
+    def _scan_plugin_files(self) -> Dict[str, Tuple[str, int]]:
+        """Map plugin names to their YAML file path and modification time"""
+        found = {}
+        try:
+            with os.scandir(self.plugins_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(('.yml', '.yaml')) and entry.is_file():
+                        found[os.path.splitext(entry.name)[0]] = (entry.path, entry.stat().st_mtime_ns)
+        except OSError as e:
+            console.print(f"[red]✗[/red] Could not scan {self.plugins_dir}: {e}")
+        return found
+    
     def _load_plugins(self):
-        """Load all YAML plugin files"""
-        for plugin_file in self.plugins_dir.glob("*.y*ml"):
+        """Load YAML plugin files that are new or changed since the last load"""
+        found = self._scan_plugin_files()
+        
+        # Forget plugins whose files were removed
+        removed = self._mtimes.keys() - found.keys()
+        for name in removed:
+            del self._mtimes[name]
+            self.plugins.pop(name, None)
+            self.plugin_meta.pop(name, None)
+        
+        changed = sorted((name, entry) for name, entry in found.items()
+                         if self._mtimes.get(name) != entry[1])
+        # Listings stay valid across reloads that find nothing new
+        if removed or changed:
+            self._invalidate_views()
+        if not changed:
+            return
+        
+        # Read and parse concurrently, then register in name order
+        parsed = {name: probe_executor().submit(_parse_plugin_file, plugin_file)
+                  for name, (plugin_file, _) in changed}
+        for name, (plugin_file, mtime) in changed:
+            # A file is only re-read once it changes again, whether or not it loaded
+            self._mtimes[name] = mtime
             try:
-                with open(plugin_file, 'r') as f:
-                    plugin_data = yaml.safe_load(f)
-                    self.plugins[plugin_file.stem] = plugin_data
-                console.print(f"[green]✓[/green] Loaded plugin: {plugin_file.stem}")
+                plugin_data = parsed[name].result()
+                meta = PluginMeta.from_plugin(name, plugin_data)
             except Exception as e:
+                # Never leave a plugin registered without its metadata, or an older version behind
+                self.plugins.pop(name, None)
+                self.plugin_meta.pop(name, None)
                 console.print(f"[red]✗[/red] Failed to load {plugin_file}: {e}")
+                continue
+            self.plugins[name], self.plugin_meta[name] = plugin_data, meta
+            console.print(f"[green]✓[/green] Loaded plugin: {name}")
+    
+    def _invalidate_views(self):
+        """Drop cached plugin listings after the plugin set changes"""
+        self._plugin_names = None
+        self._plugins_by_category = None
     
     def get_plugin(self, name: str) -> Optional[Dict[str, Any]]:
         """Get plugin configuration by name"""
         return self.plugins.get(name)
     
-    def list_plugins(self) -> List[str]:
-        """Get list of all available plugin names"""
-        return list(self.plugins.keys())
+    def get_plugin_meta(self, name: str) -> Optional[PluginMeta]:
+        """Get pre-built plugin metadata by name"""
+        return self.plugin_meta.get(name)
+    
+    def snapshot(self) -> Dict[str, PluginMeta]:
+        """Get metadata for all plugins at once"""
+        return dict(self.plugin_meta)
+    
+    def list_plugins(self) -> Tuple[str, ...]:
+        """Get all available plugin names"""
+        if self._plugin_names is None:
+            self._plugin_names = tuple(self.plugins)
+        return self._plugin_names
     
     def get_plugin_info(self, name: str) -> Dict[str, Any]:
         """Get detailed plugin information"""
-        plugin = self.get_plugin(name)
-        if not plugin:
+        meta = self.plugin_meta.get(name)
+        if not meta:
             return {}
         return {
-            'name': name,
-            'description': plugin.get('description', 'No description'),
-            'category': plugin.get('category', 'general'),
-            'parameters': plugin.get('parameters', {}),
-            'examples': plugin.get('examples', []),
-            'preferred_model': plugin.get('preferred_model', None),
-            'model_category': plugin.get('model_category', None)
+            'name': meta.name,
+            'description': meta.description,
+            'category': meta.category,
+            'parameters': meta.parameters,
+            'examples': meta.examples,
+            'preferred_model': meta.preferred_model,
+            'model_category': meta.model_category
         }
     
-    def get_plugins_by_category(self) -> Dict[str, List[str]]:
-        """Group plugins by category"""
+    def get_plugins_by_category(self) -> Mapping[str, Tuple[str, ...]]:
+        """Group plugins by category (read-only; shared until the plugins change)"""
+        if self._plugins_by_category is not None:
+            return self._plugins_by_category
+        
         categories = {}
-        for name, plugin in self.plugins.items():
-            category = plugin.get('category', 'general')
+        for name, meta in self.plugin_meta.items():
+            category = meta.category
             if category not in categories:
                 categories[category] = []
             categories[category].append(name)
-        return categories
+        self._plugins_by_category = MappingProxyType(
+            {category: tuple(names) for category, names in categories.items()}
+        )
+        return self._plugins_by_category
     
     def reload_plugins(self):
-        """Reload all plugins from disk"""
-        self.plugins.clear()
-        self._load_plugins()
+        """Reload plugins from disk, re-parsing only files that changed"""
+        self._load_plugins()  # also resets the cached listings when plugins changed
         console.print(f"[green]Reloaded {len(self.plugins)} plugins[/green]")
     
+    def debug_info(self) -> Dict[str, Any]:
+        """Describe the plugins directory and what was loaded from it, for troubleshooting"""
+        return {
+            'plugins_dir': str(self.plugins_dir.resolve()),
+            'plugins_dir_exists': self.plugins_dir.is_dir(),
+            'yaml_files': sorted(os.path.basename(path) for path, _ in self._scan_plugin_files().values()),
+            'loaded_plugins': list(self.plugins),
+            'plugin_count': len(self.plugins),
+            'plugins_data': {name: list(data) if isinstance(data, dict) else type(data).__name__
+                             for name, data in self.plugins.items()},
+        }
+    
     def validate_plugin(self, plugin_data: Dict[str, Any]) -> bool:
         """Validate plugin configuration"""
         required_fields = ['prompt']
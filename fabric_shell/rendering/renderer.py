@@ -2,58 +2,106 @@
 Response rendering module with Markdown support
 """
 
-from rich.console import Console
+import re
+import time
+from functools import lru_cache
+from typing import Iterable
+from rich.live import Live
 from rich.panel import Panel
-from rich.syntax import Syntax
-from rich.markdown import Markdown
 from rich.rule import Rule
+from ..utils.console import console
 
-console = Console()
+# Markers of significant Markdown; block markers only count at the start of a line
+_MARKDOWN_RE = re.compile(
+    r"^[ \t]*#{2,6}\s"          # Headers
+    r"|```"                     # Code blocks
+    r"|^[ \t]*[-*+] "           # Lists
+    r"|^[ \t]*\d+\. "           # Numbered lists
+    r"|\*\*"                    # Bold
+    r"|\[[^\]\n]+\]\("          # Links
+    r"|^[ \t]*\|.*\|[ \t]*$",   # Tables
+    re.MULTILINE
+)
+
+@lru_cache(maxsize=64)
+def _cached_panel(content: str, title: str, border_style: str) -> Panel:
+    """Build a response panel once per distinct content and title (help/welcome screens repeat verbatim)"""
+    return ResponseRenderer._build_panel(content, title, border_style)
 
 class ResponseRenderer:
     """Handles rendering AI responses with proper Markdown support"""
     
+    @staticmethod
+    def _build_panel(content: str, title: str, border_style: str) -> Panel:
+        """Build the response panel, using Markdown when the content looks like Markdown"""
+        # Check if content contains significant Markdown elements, in a single scan
+        has_markdown = _MARKDOWN_RE.search(content) is not None
+        
+        if has_markdown:
+            # Use Rich Markdown renderer
+            from rich.markdown import Markdown  # Pulls in markdown-it; deferred until a response needs it
+            md = Markdown(content, code_theme="monokai")
+            return Panel(md, title=f"[bold]{title}[/bold]", border_style=border_style)
+        # Use regular panel for simple text
+        return Panel(content, title=f"[bold]{title}[/bold]", border_style=border_style)
+    
     @staticmethod
     def render_ai_response(content: str, title: str = "AI Response", border_style: str = "green") -> None:
         """Render AI response with proper Markdown formatting"""
         try:
-            # Check if content contains significant Markdown elements
-            markdown_indicators = [
-                '##', '###', '####',  # Headers
-                '```',                # Code blocks
-                '- ',                 # Lists
-                '* ',                 # Lists
-                '1. ', '2. ',         # Numbered lists
-                '**',                 # Bold
-                '*',                  # Italic
-                '[',                  # Links
-                '|',                  # Tables
-            ]
-            
-            has_markdown = any(indicator in content for indicator in markdown_indicators)
-            
-            if has_markdown:
-                # Use Rich Markdown renderer
-                md = Markdown(content, code_theme="monokai")
-                console.print(Panel(md, title=f"[bold]{title}[/bold]", border_style=border_style))
-            else:
-                # Use regular panel for simple text
-                console.print(Panel(content, title=f"[bold]{title}[/bold]", border_style=border_style))
-                
+            console.print(_cached_panel(content, title, border_style))
         except Exception as e:
             # Fallback to regular panel if Markdown rendering fails
             console.print(Panel(content, title=f"[bold]{title}[/bold]", border_style=border_style))
             console.print(f"[dim yellow]Note: Markdown rendering failed: {e}[/dim yellow]")
     
+    @staticmethod
+    def render_ai_stream(chunks: Iterable[str], title: str = "AI Response", border_style: str = "green",
+                         refresh_interval: float = 0.05) -> str:
+        """Render a streamed AI response live as it arrives and return the full text"""
+        parts = []
+        last_update = 0.0
+        
+        with Live(Panel("[dim]Waiting for AI...[/dim]", title=f"[bold]{title}[/bold]", border_style=border_style),
+                  console=console, auto_refresh=False) as live:
+            for chunk in chunks:
+                parts.append(chunk)
+                
+                # Throttle re-parsing the Markdown instead of rebuilding it on every token
+                now = time.monotonic()
+                if now - last_update >= refresh_interval:
+                    try:
+                        live.update(ResponseRenderer._build_panel("".join(parts), title, border_style), refresh=True)
+                    except Exception:
+                        pass  # Partial Markdown may not render; the final update falls back below
+                    last_update = now
+            
+            content = "".join(parts)
+            try:
+                # Cached, so showing the same answer again (e.g. a repeated explanation) skips parsing
+                live.update(_cached_panel(content, title, border_style), refresh=True)
+            except Exception:
+                # Fallback to a plain panel if Markdown rendering fails
+                live.update(Panel(content, title=f"[bold]{title}[/bold]", border_style=border_style), refresh=True)
+        
+        return content
+    
     @staticmethod
     def render_code_block(code: str, language: str, title: str = "Code") -> None:
         """Render code block with syntax highlighting"""
+        from rich.syntax import Syntax  # Pulls in Pygments; only needed here
         console.print(Panel(
             Syntax(code, language, theme="monokai", line_numbers=True),
             title=f"[bold]{title}[/bold]",
             border_style="yellow"
         ))
     
+    @staticmethod
+    def render_cache_notice(created: float) -> None:
+        """Note that the response shown above was served from the response cache"""
+        console.print(f"[dim]↺ Cached response from {time.strftime('%Y-%m-%d %H:%M', time.localtime(created))} "
+                      f"(use 'set nocache' to regenerate)[/dim]")
+    
     @staticmethod
     def render_section_divider(text: str = None) -> None:
         """Render a section divider"""
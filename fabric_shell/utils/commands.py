@@ -2,43 +2,287 @@
 Command execution utilities with fixed PowerShell handling
 """
 
+import base64
+import heapq
 import json
+import os
+import queue
+import re
+import sqlite3
 import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from rich.console import Console
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
+from rich.console import Group
 from rich.panel import Panel
 from rich.prompt import Prompt
+from .console import console
 
-console = Console()
+# Full-text matches re-ranked by word overlap when looking up similar past commands
+SIMILAR_CANDIDATES = 50
+
+# Newest history entries kept; older rows are pruned from the table and its index on insert
+MAX_HISTORY_ENTRIES = 100
+
+# Bytes of stdout and of stderr kept per command; the rest is read and discarded
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+# Characters of command output shown in the result panel; Rich lays out every line it is given
+MAX_PANEL_CHARS = 16 * 1024
+
+# Answers accepted when asking whether to run a generated command; empty input means no
+_EXECUTE_CHOICES = frozenset({"y", "n", "e", "yes", "no", "explain"})
+_EXECUTE_PROMPT = ("Execute command? [green]Y[/green]es/[red]N[/red]o/[yellow]E[/yellow]xplain "
+                   "[bold magenta]\\[y/n/e/yes/no/explain][/bold magenta] [bold cyan](n)[/bold cyan]: ")
+
+# Seconds a command may run before the "Executing" spinner appears
+STATUS_DELAY = 0.15
+
+@contextmanager
+def delayed_status(message: str, delay: float = STATUS_DELAY):
+    """Show a spinner for the block only once it has run for `delay` seconds, so fast
+    commands never start Rich's live display"""
+    status = console.status(message, spinner="dots")
+    lock = threading.Lock()
+    started = finished = False
+    
+    def start():
+        nonlocal started
+        with lock:
+            if not finished:
+                status.start()
+                started = True
+    
+    timer = threading.Timer(delay, start)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        timer.cancel()
+        with lock:
+            finished = True
+            if started:
+                status.stop()
+
+# Words too common to say anything about what a task is, ignored when matching similar tasks
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "please", "that", "the", "this", "to", "with",
+})
+
+@lru_cache(maxsize=1024)
+def _words(text: str) -> frozenset:
+    """Lowercased word set of a task description without stopwords, cached across similarity lookups"""
+    return frozenset(text.lower().split()) - STOPWORDS
+
+# CIM class names that fail in -NoProfile PowerShell, with their working replacements
+_CIM_CLASS_FIXES = {
+    'CIMOperatingSystem': 'CIM_OperatingSystem',
+    'CIMProcess': 'CIM_Process',
+    'CIMService': 'CIM_Service',
+    'CIMDisk': 'CIM_LogicalDisk',
+    'CIMProcessor': 'CIM_Processor',
+    'CIMMemory': 'CIM_PhysicalMemory',
+}
+
+# Alternative approaches for common tasks that fail in -NoProfile
+_CIM_QUERY_FIXES = {
+    'CIM_OperatingSystem': 'Get-ComputerInfo',
+    'CIM_Process': 'Get-Process',
+    'CIM_Service': 'Get-Service',
+    'CIM_LogicalDisk': 'Get-WmiObject -Class Win32_LogicalDisk',
+}
+
+# Every fix keyed by the exact text it replaces; queries match with either spelling of the class
+_POWERSHELL_FIXES = MappingProxyType({
+    **_CIM_CLASS_FIXES,
+    **{f'Get-CimInstance -ClassName {cls}': query for cls, query in _CIM_QUERY_FIXES.items()},
+    **{f'Get-CimInstance -ClassName {old}': _CIM_QUERY_FIXES[new]
+       for old, new in _CIM_CLASS_FIXES.items() if new in _CIM_QUERY_FIXES},
+})
+
+# Longest alternatives first, so a query wins over the class name inside it
+_POWERSHELL_FIX_RE = re.compile(
+    "(?:" + "|".join(map(re.escape, sorted(_POWERSHELL_FIXES, key=len, reverse=True))) + r")\b"
+)
+
+# Tokens that mark a command as PowerShell in passthrough mode
+_PS_INDICATOR_RE = re.compile(
+    r"Get-|Set-|New-|Remove-|Start-|Stop-|\$env:|\$_|Where-Object|ForEach-Object|Select-Object"
+)
+
+# Commands that often need profile/modules
+_PROFILE_DEPENDENT_RE = re.compile(
+    r"Get-CimInstance|Import-Module|Get-ADUser|Get-ExchangeServer|Connect-|New-PSSession|Enter-PSSession|Invoke-Command"
+)
+
+@lru_cache(maxsize=256)
+def _needs_profile(command: str) -> bool:
+    """Whether a PowerShell command needs the user's profile to run"""
+    return _PROFILE_DEPENDENT_RE.search(command) is not None
+
+@lru_cache(maxsize=256)
+def _fix_powershell(command: str) -> str:
+    """Apply all PowerShell fixes to a command in a single scan"""
+    return _POWERSHELL_FIX_RE.sub(lambda match: _POWERSHELL_FIXES[match.group(0)], command)
+
+def _drain(pipe, captured: Dict[str, Any]):
+    """Read a pipe to its end, keeping at most MAX_OUTPUT_BYTES of it"""
+    with pipe:
+        for chunk in iter(lambda: pipe.read1(65536), b''):
+            room = MAX_OUTPUT_BYTES - captured['size']
+            if room > 0:
+                captured['chunks'].append(chunk[:room])
+            captured['size'] += len(chunk)
+
+def _captured_text(captured: Dict[str, Any]) -> str:
+    """Decode captured output the way text-mode subprocess.run does, noting anything dropped"""
+    text = b''.join(captured['chunks']).decode('utf-8', errors='replace')
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    dropped = captured['size'] - MAX_OUTPUT_BYTES
+    if dropped > 0:
+        text += f"\n[... {dropped} more bytes not captured ...]"
+    return text
+
+def run_captured(args, timeout: float, shell: bool = False) -> subprocess.CompletedProcess:
+    """Like subprocess.run(capture_output=True, text=True), but reads the output while the
+    command runs and keeps at most MAX_OUTPUT_BYTES of each stream in memory"""
+    deadline = time.monotonic() + timeout
+    process = subprocess.Popen(args, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=-1)
+    stdout, stderr = {'chunks': [], 'size': 0}, {'chunks': [], 'size': 0}
+    readers = [threading.Thread(target=_drain, args=(pipe, captured), daemon=True)
+               for pipe, captured in ((process.stdout, stdout), (process.stderr, stderr))]
+    for reader in readers:
+        reader.start()
+    
+    try:
+        process.wait(timeout=timeout)
+        # Background children may hold the pipes open after the command itself exits
+        for reader in readers:
+            reader.join(max(0.0, deadline - time.monotonic()))
+        if any(reader.is_alive() for reader in readers):
+            raise subprocess.TimeoutExpired(args, timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    
+    return subprocess.CompletedProcess(args, process.returncode, _captured_text(stdout), _captured_text(stderr))
 
 class CommandHistoryManager:
     """Manages command execution history and success tracking"""
     
-    def __init__(self, history_file: str = "command_history.json"):
+    def __init__(self, history_file: str = "command_history.db"):
         self.history_file = Path(history_file)
-        self.history = self._load_history()
+        self._db = self._open_database()
+        # Rows are appended by this process only, so the count is tracked instead of queried
+        self._count, self._last_id = self._db.execute(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM history").fetchone()
+        if not self._count:
+            self._import_json_history()
     
-    def _load_history(self) -> List[Dict[str, Any]]:
-        """Load command history from file"""
-        if not self.history_file.exists():
-            return []
+    def _open_database(self) -> sqlite3.Connection:
+        """Open the history database, creating the tables on first use"""
+        try:
+            db = sqlite3.connect(self.history_file, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            # Commits only append to the WAL; fsyncs are batched into checkpoints
+            db.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            console.print(f"[yellow]Warning: Could not open history database, history will not be saved: {e}[/yellow]")
+            db = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
         
+        db.row_factory = sqlite3.Row
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                command TEXT NOT NULL,
+                task_description TEXT NOT NULL,
+                shell_type TEXT NOT NULL,
+                output_preview TEXT NOT NULL DEFAULT '',
+                success INTEGER NOT NULL DEFAULT 1
+            );
+        """)
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            console.print(f"[yellow]Warning: Could not load history file: {e}[/yellow]")
-            return []
+            # Full-text index over task descriptions for similar-command lookups
+            db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                       "task_description, content='history', content_rowid='id')")
+            self._has_fts = True
+        except sqlite3.OperationalError:
+            self._has_fts = False  # SQLite built without FTS5; lookups scan the table instead
+        return db
     
-    def _save_history(self):
-        """Save command history to file"""
+    def _import_json_history(self):
+        """Import entries from the JSON history file used by earlier versions"""
+        json_file = self.history_file.with_suffix('.json')
+        if not json_file.exists():
+            return
+        
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history[-100:], f, indent=2, ensure_ascii=False)  # Keep last 100 entries
+            with open(json_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for entry in entries:
+                self._insert(entry)
         except Exception as e:
-            console.print(f"[yellow]Warning: Could not save history: {e}[/yellow]")
+            console.print(f"[yellow]Warning: Could not import history file: {e}[/yellow]")
+    
+    def _insert(self, entry: Dict[str, Any]):
+        """Store one history entry and index its task description"""
+        cursor = self._db.execute(
+            "INSERT INTO history (timestamp, command, task_description, shell_type, output_preview, success) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (entry['timestamp'], entry['command'], entry['task_description'], entry['shell_type'],
+             entry.get('output_preview', ''), int(entry.get('success', False)))
+        )
+        if self._has_fts:
+            self._db.execute("INSERT INTO history_fts (rowid, task_description) VALUES (?, ?)",
+                             (cursor.lastrowid, entry['task_description']))
+        self._count += 1
+        self._last_id = cursor.lastrowid
+        if self._count > MAX_HISTORY_ENTRIES:
+            self._prune()
+    
+    def _prune(self):
+        """Drop everything but the newest MAX_HISTORY_ENTRIES rows"""
+        row = self._db.execute("SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?",
+                               (MAX_HISTORY_ENTRIES,)).fetchone()
+        if row is None:
+            return
+        if self._has_fts:
+            # External-content index: removals must be given the indexed text
+            self._db.execute("INSERT INTO history_fts (history_fts, rowid, task_description) "
+                             "SELECT 'delete', id, task_description FROM history WHERE id <= ?", (row['id'],))
+        self._count -= self._db.execute("DELETE FROM history WHERE id <= ?", (row['id'],)).rowcount
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @property
+    def last_id(self) -> int:
+        """Row id of the newest entry; it grows with every insert, also once the cap prunes old entries"""
+        return self._last_id
+    
+    def recent(self, limit: int = 10, after_id: int = 0) -> List[Dict[str, Any]]:
+        """Get the most recent history entries newer than after_id, oldest first"""
+        rows = self._db.execute("SELECT * FROM history WHERE id > ? ORDER BY id DESC LIMIT ?",
+                                (after_id, limit)).fetchall()
+        return [self._entry(row) for row in reversed(rows)]
+    
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a database row into a history entry"""
+        entry = dict(row)
+        del entry['id']
+        entry['success'] = bool(entry['success'])
+        return entry
     
     def add_successful_command(self, command: str, task_description: str, shell_type: str, output: str = ""):
         """Add a successful command to history"""
@@ -51,30 +295,46 @@ class CommandHistoryManager:
             "success": True
         }
         
-        self.history.append(entry)
-        self._save_history()
+        try:
+            self._insert(entry)
+        except sqlite3.Error as e:
+            console.print(f"[yellow]Warning: Could not save history: {e}[/yellow]")
+    
+    def _candidates(self, task_words: set) -> List[sqlite3.Row]:
+        """Successful entries that share at least one word with the task, best text matches first"""
+        if not self._has_fts:
+            return self._db.execute("SELECT * FROM history WHERE success").fetchall()
+        
+        # Each word becomes a quoted FTS5 string, so punctuation in it cannot break the query syntax
+        query = " OR ".join('"' + word.replace('"', '""') + '"' for word in task_words)
+        try:
+            return self._db.execute(
+                "SELECT history.* FROM history_fts JOIN history ON history.id = history_fts.rowid "
+                "WHERE history_fts MATCH ? AND history.success ORDER BY history_fts.rank LIMIT ?",
+                (query, SIMILAR_CANDIDATES)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
     
     def get_similar_commands(self, task_description: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Find similar successful commands based on task description"""
-        task_lower = task_description.lower()
-        task_words = set(task_lower.split())
+        task_words = _words(task_description)
+        if not task_words:
+            return []
         
-        # Score commands based on word overlap
+        # Score the indexed matches by word overlap
         scored_commands = []
-        for entry in self.history:
-            if not entry.get('success', False):
-                continue
-                
-            entry_words = set(entry['task_description'].lower().split())
+        for row in self._candidates(task_words):
+            entry_words = _words(row['task_description'])
             overlap = len(task_words.intersection(entry_words))
             
             if overlap > 0:
-                score = overlap / len(task_words.union(entry_words))
-                scored_commands.append((score, entry))
+                # Size of the union, without building it
+                score = overlap / (len(task_words) + len(entry_words) - overlap)
+                scored_commands.append((score, self._entry(row)))
         
-        # Sort by score and return top matches
-        scored_commands.sort(key=lambda x: x[0], reverse=True)
-        return [entry for score, entry in scored_commands[:limit]]
+        # Top matches by score; ties keep their rank order, as a stable sort would
+        return [entry for score, entry in heapq.nlargest(limit, scored_commands, key=lambda x: x[0])]
     
     def get_context_string(self, task_description: str) -> str:
         """Get context string for AI prompt based on similar commands"""
@@ -83,19 +343,124 @@ class CommandHistoryManager:
         if not similar:
             return ""
         
-        context = "\n## Previously Successful Commands\n"
-        context += "Based on similar tasks, these commands have worked before:\n\n"
+        parts = ["\n## Previously Successful Commands\n"
+                 "Based on similar tasks, these commands have worked before:\n\n"]
         
         for i, entry in enumerate(similar, 1):
-            context += f"{i}. **Task:** {entry['task_description']}\n"
-            context += f"   **Command:** `{entry['command']}`\n"
-            context += f"   **Shell:** {entry['shell_type']}\n"
-            if entry.get('output_preview'):
-                context += f"   **Result:** {entry['output_preview']}\n"
-            context += "\n"
+            result = f"   **Result:** {entry['output_preview']}\n" if entry.get('output_preview') else ""
+            parts.append(f"{i}. **Task:** {entry['task_description']}\n"
+                         f"   **Command:** `{entry['command']}`\n"
+                         f"   **Shell:** {entry['shell_type']}\n"
+                         f"{result}\n")
+        
+        parts.append("Consider these successful patterns when generating the new command.\n")
+        return "".join(parts)
+
+
+class PowerShellHost:
+    """A long-lived `powershell -NoProfile` process that runs commands one after another,
+    so only the first command pays PowerShell's startup time.
+    
+    Each command runs in a child scope after the location is reset to this process's working
+    directory, so variables, functions, preference settings and `cd` do not carry over to the
+    next command. Process-wide state such as `$env:` variables and loaded modules still does.
+    Opt-in (FABRIC_SHELL_PERSISTENT_POWERSHELL=1) until it has been verified on Windows PowerShell.
+    """
+    
+    ARGS = ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", "-"]
+    
+    # Sent as a single ASCII line: the command and working directory travel base64-encoded, so
+    # quoting and line breaks cannot end the statement early. The command runs inside `& {{ }}`,
+    # a fresh child scope. Output and errors are each followed by an end marker, and the exit
+    # code is taken from $LASTEXITCODE or from whether the command added to $Error.
+    SCRIPT = (
+        "$__cwd = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{cwd}')); "
+        "Set-Location -LiteralPath $__cwd; [Environment]::CurrentDirectory = $__cwd; "
+        "$global:LASTEXITCODE = 0; $__errors = $Error.Count; $__ok = $true; "
+        "try {{ & {{ Invoke-Expression ([Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{command}'))) }} "
+        "| Out-String -Stream | ForEach-Object {{ [Console]::Out.WriteLine($_) }}; "
+        "$__ok = $Error.Count -eq $__errors }} "
+        "catch {{ [Console]::Error.WriteLine($_); $__ok = $false }}; "
+        "$__code = if ($LASTEXITCODE) {{ $LASTEXITCODE }} elseif ($__ok) {{ 0 }} else {{ 1 }}; "
+        "[Console]::Out.WriteLine(\"{marker}:$__code\"); [Console]::Error.WriteLine('{marker}')"
+    )
+    
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._stdout: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stderr: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()  # One command at a time
+    
+    def _ensure_started(self):
+        """Start the PowerShell process if it is not running"""
+        if self._process is not None and self._process.poll() is None:
+            return
         
-        context += "Consider these successful patterns when generating the new command.\n"
-        return context
+        self._process = subprocess.Popen(
+            self.ARGS, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', errors='replace', bufsize=1
+        )
+        self._stdout, self._stderr = queue.Queue(), queue.Queue()
+        for stream, lines in ((self._process.stdout, self._stdout), (self._process.stderr, self._stderr)):
+            threading.Thread(target=self._pump, args=(stream, lines), daemon=True).start()
+        self._send("[Console]::OutputEncoding = [Text.Encoding]::UTF8")
+    
+    @staticmethod
+    def _pump(stream, lines: "queue.Queue[Optional[str]]"):
+        """Forward lines from a pipe to a queue; None marks the end of the stream"""
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+    
+    def _send(self, line: str):
+        self._process.stdin.write(line + "\n")
+        self._process.stdin.flush()
+    
+    def _read_until(self, lines: "queue.Queue[Optional[str]]", marker: str,
+                    deadline: float, timeout: int) -> Tuple[str, Optional[str]]:
+        """Collect lines up to the end marker; returns the text and what followed the marker"""
+        collected = []
+        while True:
+            try:
+                line = lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                # The command is still running; the only way to stop it is to end the process
+                self.close()
+                raise subprocess.TimeoutExpired(self.ARGS, timeout)
+            if line is None:  # The command ended PowerShell, e.g. with `exit`
+                return "".join(collected), None
+            # Output without a trailing newline puts the marker at the end of its last line
+            position = line.find(marker)
+            if position >= 0:
+                collected.append(line[:position])
+                return "".join(collected), line[position + len(marker):].strip()
+            collected.append(line)
+    
+    def run(self, command: str, timeout: int = 30) -> subprocess.CompletedProcess:
+        """Run a command, like subprocess.run with captured text output"""
+        with self._lock:
+            self._ensure_started()
+            marker = f"<<<END:{uuid.uuid4().hex}"
+            self._send(self.SCRIPT.format(command=base64.b64encode(command.encode('utf-8')).decode('ascii'),
+                                          cwd=base64.b64encode(os.getcwd().encode('utf-8')).decode('ascii'),
+                                          marker=marker))
+            
+            deadline = time.monotonic() + timeout
+            stdout, code = self._read_until(self._stdout, marker, deadline, timeout)
+            stderr, _ = self._read_until(self._stderr, marker, deadline, timeout)
+            if code is None:
+                returncode = self._process.wait()
+                self._process = None
+            else:
+                returncode = int(code.lstrip(':') or 0)
+            return subprocess.CompletedProcess(self.ARGS, returncode, stdout, stderr)
+    
+    def close(self):
+        """Stop the PowerShell process"""
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
 
 
 class CommandExecutor:
@@ -103,6 +468,21 @@ class CommandExecutor:
     
     def __init__(self):
         self.history_manager = CommandHistoryManager()
+        # Commands that work without a profile can share one PowerShell process (opt-in)
+        self._powershell = (PowerShellHost() if os.environ.get('FABRIC_SHELL_PERSISTENT_POWERSHELL') == '1'
+                            else None)
+        self._execution_policy: Optional[str] = None
+    
+    def close(self):
+        """Stop the shared PowerShell process, if one was started"""
+        if self._powershell is not None:
+            self._powershell.close()
+    
+    def _run_noprofile_powershell(self, command: str, timeout: int) -> subprocess.CompletedProcess:
+        """Run a command with `powershell -NoProfile`, in the shared process when it is enabled"""
+        if self._powershell is not None:
+            return self._powershell.run(command, timeout)
+        return run_captured(["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", command], timeout)
     
     def get_command_context(self, task_description: str) -> str:
         """Get context from command history for AI prompt"""
@@ -118,11 +498,10 @@ class CommandExecutor:
                           border_style="cyan"))
         
         while True:
-            choice = Prompt.ask(
-                f"Execute command? [green]Y[/green]es/[red]N[/red]o/[yellow]E[/yellow]xplain", 
-                choices=["y", "n", "e", "yes", "no", "explain"], 
-                default="n"
-            ).lower()
+            choice = console.input(_EXECUTE_PROMPT).strip().lower() or "n"
+            if choice not in _EXECUTE_CHOICES:
+                console.print("[prompt.invalid.choice]Please select one of the available options")
+                continue
             
             if choice in ["e", "explain"]:
                 self._explain_command(command, task_description, shell_type, ai_chat_func)
@@ -185,14 +564,28 @@ Use clear, non-technical language where possible."""
                           border_style="yellow"))
         
         try:
+            # Streaming AI functions return an iterator of chunks instead of the full text;
+            # those that render the explanation themselves return None
             explanation = ai_chat_func(explain_prompt)
+            if explanation is None:
+                return
             
-            # Use the renderer if available, otherwise use a simple panel
+            # Use the renderer if available, otherwise use a simple panel.
+            # Imported here because the renderer imports this package for the shared console;
+            # its methods are static, so no instance is needed
             try:
                 from ..rendering.renderer import ResponseRenderer
-                renderer = ResponseRenderer()
-                renderer.render_ai_response(explanation, "Command Explanation", "blue")
             except ImportError:
+                ResponseRenderer = None
+            
+            if ResponseRenderer is not None:
+                if isinstance(explanation, str):
+                    ResponseRenderer.render_ai_response(explanation, "Command Explanation", "blue")
+                else:
+                    ResponseRenderer.render_ai_stream(explanation, "Command Explanation", "blue")
+            else:
+                if not isinstance(explanation, str):
+                    explanation = "".join(explanation)
                 console.print(Panel(explanation, title="[blue]Command Explanation[/blue]", 
                                   border_style="blue"))
         except Exception as e:
@@ -201,35 +594,22 @@ Use clear, non-technical language where possible."""
     def _fix_powershell_command(self, command: str) -> str:
         """Fix common PowerShell command issues for -NoProfile execution"""
         
-        # Common fixes for restricted PowerShell environment
-        fixes = {
-            # CIM class name fixes
-            'CIMOperatingSystem': 'CIM_OperatingSystem',
-            'CIMProcess': 'CIM_Process',
-            'CIMService': 'CIM_Service',
-            'CIMDisk': 'CIM_LogicalDisk',
-            'CIMProcessor': 'CIM_Processor',
-            'CIMMemory': 'CIM_PhysicalMemory',
-            
-            # Alternative approaches for common tasks that fail in -NoProfile
-            'Get-CimInstance -ClassName CIM_OperatingSystem': 'Get-ComputerInfo',
-            'Get-CimInstance -ClassName CIM_Process': 'Get-Process',
-            'Get-CimInstance -ClassName CIM_Service': 'Get-Service',
-            'Get-CimInstance -ClassName CIM_LogicalDisk': 'Get-WmiObject -Class Win32_LogicalDisk',
-        }
-        
-        fixed_command = command
-        for old, new in fixes.items():
-            fixed_command = fixed_command.replace(old, new)
-        
-        return fixed_command
+        # Cached, so the second call per execution is a dictionary hit
+        return _fix_powershell(command)
     
     def _get_powershell_execution_policy(self) -> str:
-        """Get current PowerShell execution policy"""
+        """Get current PowerShell execution policy, queried once per session"""
+        if self._execution_policy is None:
+            self._execution_policy = self._query_powershell_execution_policy()
+        return self._execution_policy
+    
+    @staticmethod
+    def _query_powershell_execution_policy() -> str:
         try:
             result = subprocess.run(
                 ["powershell", "-NoProfile", "-Command", "Get-ExecutionPolicy"],
                 capture_output=True,
+                bufsize=-1,
                 text=True,
                 timeout=10
             )
@@ -241,27 +621,16 @@ Use clear, non-technical language where possible."""
     
     def _should_use_profile_powershell(self, command: str) -> bool:
         """Determine if we should use PowerShell with profile for this command"""
-        
-        # Commands that often need profile/modules
-        profile_dependent_patterns = [
-            'Get-CimInstance',
-            'Import-Module',
-            'Get-ADUser',
-            'Get-ExchangeServer',
-            'Connect-',
-            'New-PSSession',
-            'Enter-PSSession',
-            'Invoke-Command',
-        ]
-        
-        return any(pattern in command for pattern in profile_dependent_patterns)
+        return _needs_profile(command)
     
     def execute_command(self, command: str, language: str = None, timeout: int = 30) -> Dict[str, Any]:
         """Execute shell command and return result"""
         shell_type = language or "bash"
+        # Fixes for -NoProfile mode, also reported in the result
+        fixed_command = self._fix_powershell_command(command) if shell_type == "powershell" else command
         
         try:
-            with console.status("[yellow]Executing...", spinner="dots"):
+            with delayed_status("[yellow]Executing..."):
                 # Build command based on shell type
                 if shell_type == "powershell":
                     # Check if command needs profile or can work with -NoProfile
@@ -270,27 +639,19 @@ Use clear, non-technical language where possible."""
                         # Use PowerShell with profile but set minimal execution policy
                         cmd = ["powershell", "-ExecutionPolicy", "Bypass", "-Command", command]
                     else:
-                        # Apply fixes for -NoProfile mode
-                        fixed_command = self._fix_powershell_command(command)
                         if fixed_command != command:
                             console.print(f"[dim yellow]Applied PowerShell compatibility fixes[/dim yellow]")
                         
                         # Use -NoProfile for better compatibility
-                        cmd = ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", fixed_command]
+                        cmd = None
+                        result = self._run_noprofile_powershell(fixed_command, timeout)
                 elif shell_type == "python":
                     cmd = ["python", "-c", command]
                 else:
                     cmd = command
                 
-                result = subprocess.run(
-                    cmd,
-                    shell=(shell_type not in ["powershell", "python"]),
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout,
-                    encoding='utf-8',
-                    errors='replace'
-                )
+                if cmd is not None:
+                    result = run_captured(cmd, timeout, shell=(shell_type not in ["powershell", "python"]))
             
             return {
                 'success': result.returncode == 0,
@@ -298,7 +659,7 @@ Use clear, non-technical language where possible."""
                 'stderr': result.stderr,
                 'returncode': result.returncode,
                 'command': command,
-                'fixed_command': self._fix_powershell_command(command) if shell_type == "powershell" else command
+                'fixed_command': fixed_command
             }
         except subprocess.TimeoutExpired:
             return {'error': f'Command timed out after {timeout} seconds', 'command': command}
@@ -308,40 +669,21 @@ Use clear, non-technical language where possible."""
     def execute_raw_command(self, command: str, timeout: int = 30) -> Dict[str, Any]:
         """Execute raw command without confirmation (for passthrough)"""
         try:
-            with console.status(f"[yellow]Executing: {command[:50]}...[/yellow]", spinner="dots"):
+            with delayed_status(f"[yellow]Executing: {command[:50]}...[/yellow]"):
                 # Detect if this looks like a PowerShell command
-                is_powershell = any(ps_indicator in command for ps_indicator in [
-                    'Get-', 'Set-', 'New-', 'Remove-', 'Start-', 'Stop-',
-                    '$env:', '$_', 'Where-Object', 'ForEach-Object', 'Select-Object'
-                ])
+                is_powershell = _PS_INDICATOR_RE.search(command) is not None
                 
                 if is_powershell:
                     # Apply PowerShell fixes for raw commands too
                     if self._should_use_profile_powershell(command):
                         cmd = ["powershell", "-ExecutionPolicy", "Bypass", "-Command", command]
+                        result = run_captured(cmd, timeout)
                     else:
                         fixed_command = self._fix_powershell_command(command)
-                        cmd = ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", fixed_command]
-                    
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=timeout,
-                        encoding='utf-8',
-                        errors='replace'
-                    )
+                        result = self._run_noprofile_powershell(fixed_command, timeout)
                 else:
                     # Regular shell command
-                    result = subprocess.run(
-                        command,
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        timeout=timeout,
-                        encoding='utf-8',
-                        errors='replace'
-                    )
+                    result = run_captured(command, timeout, shell=True)
             
             return {
                 'success': result.returncode == 0,
@@ -362,6 +704,8 @@ Use clear, non-technical language where possible."""
             console.print("[yellow]Execution cancelled[/yellow]")
         elif result.get('success'):
             stdout = result.get('stdout', '').strip()
+            if len(stdout) > MAX_PANEL_CHARS:
+                stdout = f"{stdout[:MAX_PANEL_CHARS]}\n[... {len(stdout) - MAX_PANEL_CHARS} more characters ...]"
             if stdout:
                 console.print(Panel(stdout, title="[green]Output[/green]", border_style="green"))
             else:
@@ -383,41 +727,47 @@ Use clear, non-technical language where possible."""
                     result['user_confirmed_failure'] = True
                     return "User confirmed command didn't accomplish the goal"
         else:
-            error = result.get('stderr') or result.get('error') or "Unknown error"
-            console.print(Panel(error.strip(), title="[red]Error[/red]", border_style="red"))
+            error = (result.get('stderr') or result.get('error') or "Unknown error").strip()
+            parts = [Panel(error, title="[red]Error[/red]", border_style="red")]
             
             # Show helpful PowerShell troubleshooting if needed
             if 'powershell' in str(result.get('command', '')).lower():
-                self._show_powershell_troubleshooting(error.strip())
+                tips = self._powershell_troubleshooting_panel(error)
+                if tips:
+                    parts.append(tips)
             
-            return error.strip()
+            # One print for the error and its tips, so Rich lays them out in a single pass
+            console.print(Group(*parts))
+            return error
         return None
     
-    def _show_powershell_troubleshooting(self, error: str):
-        """Show PowerShell-specific troubleshooting tips"""
+    def _powershell_troubleshooting_panel(self, error: str) -> Optional[Panel]:
+        """Build a panel of PowerShell-specific troubleshooting tips, if any apply"""
         
         troubleshooting_tips = []
+        error = error.lower()
         
-        if "execution policy" in error.lower():
+        if "execution policy" in error:
             troubleshooting_tips.append("• Try: Set-ExecutionPolicy -ExecutionPolicy RemoteSigned -Scope CurrentUser")
         
-        if "invalid class" in error.lower() or "cim" in error.lower():
+        if "invalid class" in error or "cim" in error:
             troubleshooting_tips.append("• CIM classes may not be available in restricted mode")
             troubleshooting_tips.append("• Try using Get-WmiObject instead of Get-CimInstance")
             troubleshooting_tips.append("• Alternative: Use Get-ComputerInfo for system information")
         
-        if "module" in error.lower():
+        if "module" in error:
             troubleshooting_tips.append("• Module may not be auto-loaded in -NoProfile mode")
             troubleshooting_tips.append("• Try: Import-Module <ModuleName> first")
         
-        if "not recognized" in error.lower():
+        if "not recognized" in error:
             troubleshooting_tips.append("• Command may be from a module not loaded")
             troubleshooting_tips.append("• Check available commands with: Get-Command *keyword*")
         
         if troubleshooting_tips:
             tips_text = "\n".join(troubleshooting_tips)
-            console.print(Panel(
+            return Panel(
                 tips_text,
                 title="[blue]PowerShell Troubleshooting Tips[/blue]",
                 border_style="blue"
-            ))
\ No newline at end of file
+            )
+        return None
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+Shared Rich console used by every module
+"""
+
+from rich.console import Console
+
+# One instance, so all output goes through a single lock, terminal probe and live display
+console = Console()
@@ -5,6 +5,37 @@ Text and command extraction utilities
 import re
 from typing import Optional
 
+# Patterns compiled once at import instead of on every extraction
+# Code fences with their language tag and stray backticks, removed in one pass
+_BACKTICKS_RE = re.compile(r'```[\w]*\s*|`')
+_BOLD_RE = re.compile(r'\*\*[^*]+\*\*')
+_BULLET_RE = re.compile(r'^\s*[\*\-]\s*', re.MULTILINE)
+_MARKDOWN_CHARS_RE = re.compile(r'[*_`]')
+_COMMON_COMMAND_RE = re.compile(r'^(git|ls|cd|pwd|mkdir|rm|cp|mv|cat|grep|find|ps|top)\b')
+
+# Explanatory text patterns, matched anywhere in a line regardless of case
+_SKIP_PATTERNS = [
+    'note:', 'here', 'this', 'you', 'the', 'explanation', 'import', 
+    'modification', 'corrected', 'command', 'alternative', 'approach',
+    'if you', 'can:', 'should', 'would', 'could', 'example:', 'description'
+]
+_SKIP_RE = re.compile('|'.join(map(re.escape, _SKIP_PATTERNS)), re.IGNORECASE)
+
+# Language keywords in priority order, matched in one pass by detect_language
+_LANGUAGE_KEYWORDS = {
+    "powershell": ['$', 'get-', 'set-', 'new-', 'import-module'],
+    "bash": ['#!/bin/bash', 'echo', 'grep', 'awk', 'sed'],
+    "python": ['import ', 'def ', 'print(', 'if __name__'],
+    "javascript": ['function', 'var ', 'const ', 'let ']
+}
+_LANGUAGE_ORDER = list(_LANGUAGE_KEYWORDS)
+_LANGUAGE_PRIORITY = {lang: index for index, lang in enumerate(_LANGUAGE_ORDER)}
+_LANGUAGE_BY_KEYWORD = {keyword: lang for lang, keywords in _LANGUAGE_KEYWORDS.items() for keyword in keywords}
+# Lookahead makes matches zero-width so overlapping keywords are all seen
+_LANGUAGE_KEYWORD_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(keyword) for keyword in _LANGUAGE_BY_KEYWORD) + '))'
+)
+
 class TextExtractor:
     """Utilities for extracting commands and code from AI responses"""
     
@@ -12,25 +43,17 @@ class TextExtractor:
     def extract_clean_command(text: str) -> str:
         """Extract clean command from AI response"""
         # Remove markdown and backticks more aggressively
-        text = re.sub(r'```[\w]*\s*', '', text)
-        text = re.sub(r'```', '', text)
-        text = text.replace('`', '')
+        text = _BACKTICKS_RE.sub('', text)
         
         # Remove common AI response patterns
-        text = re.sub(r'\*\*[^*]+\*\*', '', text)  # Remove **bold** text
-        text = re.sub(r'^\s*[\*\-]\s*', '', text, flags=re.MULTILINE)  # Remove bullet points
+        text = _BOLD_RE.sub('', text)  # Remove **bold** text
+        text = _BULLET_RE.sub('', text)  # Remove bullet points
         
         lines = [line.strip() for line in text.split('\n') if line.strip()]
         
         for line in lines:
             # Skip explanatory text patterns
-            skip_patterns = [
-                'note:', 'here', 'this', 'you', 'the', 'explanation', 'import', 
-                'modification', 'corrected', 'command', 'alternative', 'approach',
-                'if you', 'can:', 'should', 'would', 'could', 'example:', 'description'
-            ]
-            
-            if any(pattern in line.lower() for pattern in skip_patterns):
+            if _SKIP_RE.search(line):
                 continue
                 
             # Skip lines that are clearly not commands
@@ -42,13 +65,13 @@ class TextExtractor:
             # Look for actual command patterns
             if line and not line.lower().startswith(('the ', 'this ', 'that ', 'a ', 'an ')):
                 # Clean up any remaining markdown
-                line = re.sub(r'[*_`]', '', line)
+                line = _MARKDOWN_CHARS_RE.sub('', line)
                 return line.strip()
         
         # If no good line found, try to find git/common commands
         for line in lines:
-            line_clean = re.sub(r'[*_`]', '', line).strip()
-            if re.match(r'^(git|ls|cd|pwd|mkdir|rm|cp|mv|cat|grep|find|ps|top)\b', line_clean):
+            line_clean = _MARKDOWN_CHARS_RE.sub('', line).strip()
+            if _COMMON_COMMAND_RE.match(line_clean):
                 return line_clean
         
         return lines[0] if lines else ""
@@ -56,12 +79,22 @@ class TextExtractor:
     @staticmethod
     def extract_code_blocks(text: str) -> list:
         """Extract code blocks from AI response"""
-        # Find code blocks
-        code_pattern = r'```(?:(\w+))?\s*(.*?)```'
-        matches = re.findall(code_pattern, text, re.DOTALL | re.IGNORECASE)
+        # Single linear pass: odd segments between fences are code blocks,
+        # and an unterminated trailing fence is ignored
+        parts = text.split('```')
         
         code_blocks = []
-        for lang, code in matches:
+        for i in range(1, len(parts) - 1, 2):
+            block = parts[i]
+            newline = block.find('\n')
+            header = block[:newline].strip() if newline != -1 else ''
+            
+            # A single word on the fence line is the language tag
+            if header and ' ' not in header:
+                lang, code = header, block[newline + 1:]
+            else:
+                lang, code = None, block
+            
             if len(code.strip()) > 5:
                 code_blocks.append({
                     'language': lang.lower() if lang else None,
@@ -73,17 +106,14 @@ class TextExtractor:
     @staticmethod
     def detect_language(code: str) -> str:
         """Auto-detect programming language"""
-        code_lower = code.lower()
-        
-        patterns = {
-            "powershell": ['$', 'get-', 'set-', 'new-', 'import-module'],
-            "bash": ['#!/bin/bash', 'echo', 'grep', 'awk', 'sed'],
-            "python": ['import ', 'def ', 'print(', 'if __name__'],
-            "javascript": ['function', 'var ', 'const ', 'let ']
-        }
+        # A single scan finds every keyword; the earliest-listed language still wins
+        best = len(_LANGUAGE_PRIORITY)
+        for match in _LANGUAGE_KEYWORD_RE.finditer(code.lower()):
+            best = min(best, _LANGUAGE_PRIORITY[_LANGUAGE_BY_KEYWORD[match.group(1)]])
+            if best == 0:
+                break
         
-        for lang, keywords in patterns.items():
-            if any(keyword in code_lower for keyword in keywords):
-                return lang
+        if best < len(_LANGUAGE_PRIORITY):
+            return _LANGUAGE_ORDER[best]
         
         return "bash"  # Default fallback
\ No newline at end of file
@@ -186,9 +186,7 @@ examples:
     }
     
     for filename, content in plugins.items():
-        plugin_file = plugins_dir / filename
-        with open(plugin_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        (plugins_dir / filename).write_text(content, encoding='utf-8')
         console.print(f"[green]✓[/green] Created: {filename}")
     
     console.print(f"\n[green]Created {len(plugins)} sample plugins![/green]")
@@ -0,0 +1,60 @@
+"""
+Command history storage and the cached history view in AIFabricShell
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fabric_shell.core.shell import AIFabricShell
+from fabric_shell.utils.commands import MAX_HISTORY_ENTRIES, CommandHistoryManager
+
+
+class CommandHistoryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.history = CommandHistoryManager(str(Path(tmp.name) / "history.db"))
+        self.addCleanup(self.history._db.close)
+
+        self.shell = AIFabricShell.__new__(AIFabricShell)
+        self.shell._history_rows = []
+        self.shell._history_rows_source = (0, 0)
+
+    def add(self, command):
+        self.history.add_successful_command(command, f"task for {command}", "bash")
+
+    def shown_commands(self):
+        return [row[2] for row in self.shell._get_history_rows(self.history)]
+
+    def test_history_is_capped(self):
+        for i in range(MAX_HISTORY_ENTRIES + 20):
+            self.add(f"cmd{i}")
+        self.assertEqual(len(self.history), MAX_HISTORY_ENTRIES)
+        self.assertEqual(self.history.recent(1)[0]['command'], f"cmd{MAX_HISTORY_ENTRIES + 19}")
+
+    def test_view_shows_commands_added_past_the_cap(self):
+        for i in range(MAX_HISTORY_ENTRIES):
+            self.add(f"cmd{i}")
+        self.assertEqual(self.shown_commands()[-1], f"cmd{MAX_HISTORY_ENTRIES - 1}")
+
+        # The cap keeps the length constant, but the view must still pick up new entries
+        self.add("cmdNEW")
+        self.assertEqual(len(self.history), MAX_HISTORY_ENTRIES)
+        shown = self.shown_commands()
+        self.assertEqual(shown[-1], "cmdNEW")
+        self.assertEqual(shown, [entry['command'] for entry in self.history.recent(10)])
+
+    def test_view_drops_pruned_rows(self):
+        # With a cap below the 10 shown rows, pruning removes rows that are on screen
+        with mock.patch('fabric_shell.utils.commands.MAX_HISTORY_ENTRIES', 3):
+            for command in ("a", "b", "c"):
+                self.add(command)
+            self.assertEqual(self.shown_commands(), ["a", "b", "c"])
+            self.add("d")
+            self.assertEqual(self.shown_commands(), ["b", "c", "d"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Semantic response cache reuse in AIFabricShell
+"""
+
+import math
+import tempfile
+import types
+import unittest
+import zlib
+from pathlib import Path
+
+from fabric_shell.core.prompts import render_prompt
+from fabric_shell.core.response_cache import ExactResponseCache, SemanticResponseCache
+from fabric_shell.core.shell import AIFabricShell
+
+
+def bag_of_words(text):
+    """Deterministic stand-in for an embedding model: hashed word counts"""
+    vector = [0.0] * 512
+    for word in text.lower().split():
+        vector[zlib.crc32(word.encode('utf-8')) % len(vector)] += 1.0
+    return vector
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b)) / math.sqrt(sum(x * x for x in a) * sum(y * y for y in b))
+
+
+class FakeClient:
+    """Ollama client double that answers every chat request with a numbered response"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def chat(self, model, messages, **kwargs):
+        self.prompts.append(messages[-1]['content'])
+        return {'message': {'content': f"response {len(self.prompts)}"}}
+
+
+class SemanticCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.client = FakeClient()
+
+        self.shell = AIFabricShell.__new__(AIFabricShell)
+        self.shell.model_manager = types.SimpleNamespace(current_model='model', client=self.client)
+        self.shell._system_context = self.shell._compact_system_context = "System context"
+        self.shell._exact_cache = ExactResponseCache(cache_file=str(Path(tmp.name) / "exact.json"))
+        self.shell.response_cache = SemanticResponseCache(bag_of_words,
+                                                          cache_file=str(Path(tmp.name) / "semantic.json"))
+        self.shell._cache_enabled = True
+
+    def troubleshoot(self, task, error):
+        prompt = render_prompt('troubleshoot', shell='bash', platform='Linux', task=task,
+                               command='find . -size +1M', error=error)
+        return prompt, self.shell._chat_with_ai_cached(prompt, category="troubleshoot:bash",
+                                                       semantic_text=f"find . -size +1M\n\n{error}")
+
+    def test_templated_prompts_with_different_payloads_miss(self):
+        first_prompt, first = self.troubleshoot("find big py files", "find: missing argument to `-exec'")
+        second_prompt, second = self.troubleshoot("locate large python files", "find: ‘./proc’: Permission denied")
+
+        # The rendered prompts are near-identical, well above the reuse threshold...
+        self.assertGreater(cosine(bag_of_words(first_prompt), bag_of_words(second_prompt)),
+                           self.shell.response_cache.threshold)
+        # ...but the errors differ, so the second request must not reuse the first answer
+        self.assertEqual(first, ("response 1", None))
+        self.assertEqual(second, ("response 2", None))
+        self.assertEqual(len(self.client.prompts), 2)
+
+    def test_oneliner_tasks_that_differ_in_one_word_miss(self):
+        for task in ("list files larger than 100MB", "list files smaller than 100MB"):
+            prompt = render_prompt('oneliner', shell='bash', shell_context='Linux', history='', task=task)
+            response, cached_at = self.shell._chat_with_ai_cached(prompt, category="oneliner:bash",
+                                                                  compact=True, semantic_text=task)
+            self.assertIsNone(cached_at)
+        self.assertEqual(len(self.client.prompts), 2)
+
+    def test_same_payload_in_a_different_prompt_hits(self):
+        task = "find big py files"
+        for history in ("", "\n## Previously Successful Commands\nls -la\n"):
+            prompt = render_prompt('oneliner', shell='bash', shell_context='Linux', history=history, task=task)
+            response, cached_at = self.shell._chat_with_ai_cached(prompt, category="oneliner:bash",
+                                                                  compact=True, semantic_text=task)
+        self.assertEqual(response, "response 1")
+        self.assertIsNotNone(cached_at)
+        self.assertEqual(len(self.client.prompts), 1)
+
+    def test_requests_without_semantic_text_use_the_exact_cache_only(self):
+        for task in ("list files", "list files please"):
+            self.shell._chat_with_ai_cached(task)
+        self.assertEqual(len(self.client.prompts), 2)
+
+    def test_rejected_command_is_not_served_again(self):
+        task = "find big py files"
+        prompt = render_prompt('oneliner', shell='bash', shell_context='Linux', history='', task=task)
+
+        def ask():
+            return self.shell._chat_with_ai_cached(prompt, category="oneliner:bash", compact=True,
+                                                   semantic_text=task)
+
+        response, _ = ask()
+        self.shell._forget_response(prompt, None, "oneliner:bash", response, compact=True)
+
+        # Neither the exact nor the semantic cache still holds the rejected answer
+        self.assertEqual(ask(), ("response 2", None))
+        self.assertEqual(len(self.client.prompts), 2)
+
+    def test_edited_plugin_file_is_not_answered_from_the_semantic_cache(self):
+        parameters = {'file_path': {'type': 'file'}, 'focus': {}}
+        source = "def add(a, b):\n    return a + b\n" * 20
+        for content in (source, source + "def sub(a, b):\n    return a - b\n"):
+            values = {'file_path': content, 'focus': "bugs"}
+            response, cached_at = self.shell._chat_with_ai_cached(
+                f"Review this code:\n{content}", category="plugin:code_review",
+                semantic_text=AIFabricShell._plugin_semantic_text(parameters, values))
+            self.assertIsNone(cached_at)
+        self.assertEqual(len(self.client.prompts), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()